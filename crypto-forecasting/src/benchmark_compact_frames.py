@@ -0,0 +1,94 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from data_handling.feature_creation import FeatureCreator
+from forecasting.compact_frame import (
+    to_compact_frame,
+    to_int_freq,
+    frame_memory_bytes,
+)
+
+
+def create_basket(n_symbols, n_rows, freq="15min"):
+    """Create a synthetic Nixtla training frame with the production feature set."""
+
+    rng = np.random.default_rng(42)
+    ds = pd.date_range(end="2025-02-14", periods=n_rows, freq=freq)
+    columns = ["y"] + FeatureCreator(None).get_all_feature_names()
+
+    frames = []
+    for i in range(n_symbols):
+        frame = pd.DataFrame(
+            rng.standard_normal((n_rows, len(columns))), columns=columns
+        )
+        # repeated python strings per row, as in prepare_data
+        frame.insert(0, "unique_id", [f"SYMBOL{i:03d}USDT_15m"] * n_rows)
+        frame.insert(1, "ds", ds)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def measure_training_throughput(df, freq, max_steps):
+    """Fit a short NHITS run and return the optimizer steps per second."""
+
+    from neuralforecast import NeuralForecast
+    from neuralforecast.models import NHITS
+    from neuralforecast.losses.pytorch import MAE
+
+    model = NHITS(
+        h=96,
+        input_size=96 * 7,
+        loss=MAE(),
+        max_steps=max_steps,
+        val_check_steps=max_steps,
+        n_blocks=[1, 1, 1],
+        n_pool_kernel_size=[2, 2, 2],
+        n_freq_downsample=[2, 2, 1],
+        scaler_type="minmax",
+        random_seed=42,
+        accelerator="cpu",
+        enable_progress_bar=False,
+    )
+    nf = NeuralForecast(models=[model], freq=freq)
+
+    start = time.perf_counter()
+    nf.fit(df=df)
+    return max_steps / (time.perf_counter() - start)
+
+
+def run_benchmark(n_symbols, n_rows, max_steps, skip_training):
+    print(f"Building basket of {n_symbols} symbols x {n_rows} 15m candles...")
+    default_df = create_basket(n_symbols, n_rows)
+    compact_df = to_compact_frame(default_df)
+
+    default_mb = frame_memory_bytes(default_df) / 1024**2
+    compact_mb = frame_memory_bytes(compact_df) / 1024**2
+    print(f"default frame: {default_mb:10.1f} MB")
+    print(f"compact frame: {compact_mb:10.1f} MB")
+    print(f"saving:        {100 * (1 - compact_mb / default_mb):10.1f} %")
+
+    if skip_training:
+        return
+
+    default_rate = measure_training_throughput(default_df, "15min", max_steps)
+    compact_rate = measure_training_throughput(
+        compact_df, to_int_freq("15min"), max_steps
+    )
+    print(f"default training: {default_rate:8.2f} steps/s")
+    print(f"compact training: {compact_rate:8.2f} steps/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare memory and training throughput of compact frames"
+    )
+    # 60 days of 15m candles, as fetched by BinanceDataFetcher
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=60 * 96)
+    parser.add_argument("--max_steps", type=int, default=20)
+    parser.add_argument("--skip_training", action="store_true")
+    args = parser.parse_args()
+
+    run_benchmark(args.symbols, args.rows, args.max_steps, args.skip_training)
@@ -0,0 +1,72 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ["torch", "neuralforecast", "matplotlib", "ta", "pandas"]
+
+# imports each subcommand needs before it does any actual work
+SUBCOMMAND_IMPORTS = {
+    "fetch": [
+        "from data_handling.data_fetcher import BinanceDataFetcher",
+        "from data_handling.rate_limited_client import Priority",
+    ],
+    "features": [
+        "from data_handling.data_fetcher import BinanceDataFetcher",
+        "from data_handling.feature_creation import FeatureCreator",
+    ],
+    "train": ["from forecasting.nhits_forecast import NHitsForecaster"],
+}
+
+
+def measure(code, repeats):
+    """Run code in fresh interpreters and return the wall times in seconds."""
+
+    timings = []
+    output = ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(SRC_DIR),
+            capture_output=True,
+            text=True,
+        )
+        timings.append(time.perf_counter() - start)
+        output = result.stdout.strip() or result.stderr.strip().splitlines()[-1]
+    return timings, output
+
+
+def startup_code(imports):
+    lines = [
+        "import sys",
+        f"sys.path.insert(0, {SRC_DIR!r})",
+        "import main",
+        "main.create_parser()",
+        *imports,
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+    ]
+    return "\n".join(lines)
+
+
+def run_benchmark(repeats):
+    print(f"{'subcommand':<12}{'p50 (s)':>10}{'max (s)':>10}  heavy modules loaded")
+    for name, imports in [("cli only", [])] + list(SUBCOMMAND_IMPORTS.items()):
+        timings, output = measure(startup_code(imports), repeats)
+        print(
+            f"{name:<12}{statistics.median(timings):>10.3f}"
+            f"{max(timings):>10.3f}  {output}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the startup time of the forecasting CLI"
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    run_benchmark(args.repeats)
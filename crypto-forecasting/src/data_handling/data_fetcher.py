@@ -1,27 +1,40 @@
 import glob
 import os
-import time
-import requests
 import logging
-import pandas as pd
 from datetime import datetime, timedelta
 
-from data_handling.data_validator import DataValidator
+from data_handling.rate_limited_client import (
+    Priority,
+    RequestFailedError,
+    shared_client,
+)
 
 
 class BinanceDataFetcher:
 
-    def __init__(self):
+    def __init__(self, client=None):
+        """
+        Args:
+        client: RateLimitedClient for the requests, defaults to the client
+        shared by all fetchers of the process
+        """
         self.base_url = "https://api.binance.com/api/v3/klines"
         self.data_path = str(os.environ.get("DATA_PATH"))
-
-    def fetch_multi_timeframe(self, symbol="ALGOUSDT", timeframe_filter=None):
+        # klines costs a flat weight of 2 up to the maximum limit of 1000 candles
+        self.klines_limit = 1000
+        self.klines_weight = 2
+        self.client = client or shared_client()
+
+    def fetch_multi_timeframe(
+        self, symbol="ALGOUSDT", timeframe_filter=None, priority=Priority.BACKFILL
+    ):
         """
         Fetch data for multiple timeframes
 
                 Args:
         symbol: Trading pair symbol (e.g., "ALGOUSDT")
         timeframe_filter: Optional specific timeframe to load
+        priority: Scheduling priority, Priority.LIVE requests pre-empt backfills
 
         Returns:
         Dictionary containing DataFrames for each timeframe
@@ -41,8 +54,6 @@ class BinanceDataFetcher:
             timeframes = {timeframe_filter: timeframes[timeframe_filter]}
 
         multi_data = {}
-        request_count = 0
-        minute_start = time.time()
 
         for interval, config in timeframes.items():
             start_date = datetime.now() - timedelta(days=config["days"])
@@ -53,55 +64,36 @@ class BinanceDataFetcher:
 
             current_start = start_ts
             while current_start < end_ts:
-                # Rate limit check
-                current_time = time.time()
-                if current_time - minute_start >= 60:
-                    request_count = 0
-                    minute_start = current_time
-
                 params = {
                     "symbol": symbol,
                     "interval": interval,
                     "startTime": current_start,
-                    "limit": 100,
+                    "limit": self.klines_limit,
                 }
 
                 try:
-                    response = requests.get(self.base_url, params=params)
-                    request_count += 1
-
-                    # Check for 429 (Too Many Requests) status
-                    if response.status_code == 429:
-                        retry_after = int(response.headers.get("Retry-After", 60))
-                        logging.info(
-                            f"Rate limit exceeded, waiting for {retry_after} seconds"
-                        )
-                        time.sleep(retry_after)
-                        continue
-
-                    batch_data = response.json()
-
-                    if not batch_data:
-                        break
-
-                    all_data.extend(batch_data)
-                    current_start = int(batch_data[-1][0]) + 1
-
-                    # Dynamic sleep based on rate limit usage
-                    if request_count % 10 == 0:  # Check headers every 10 requests
-                        used_weight = int(
-                            response.headers.get("X-MBX-USED-WEIGHT-1M", 0)
-                        )
-                        if used_weight > 800:  # If we're using too much weight
-                            time.sleep(1)
-                        else:
-                            time.sleep(0.1)  # Minimal delay otherwise
-
-                except Exception as e:
+                    # retries, backoff and bans are handled by the client
+                    batch_data = self.client.get(
+                        self.base_url,
+                        params=params,
+                        weight=self.klines_weight,
+                        priority=priority,
+                    )
+                except RequestFailedError as e:
                     logging.info(f"Error fetching {interval} data: {e}")
-                    continue
+                    break
+
+                if not batch_data:
+                    break
+
+                all_data.extend(batch_data)
+                current_start = int(batch_data[-1][0]) + 1
 
             if all_data:
+                # pandas is imported once data arrived, keeps fetch startup fast
+                import pandas as pd
+                from data_handling.data_validator import DataValidator
+
                 df = pd.DataFrame(
                     all_data,
                     columns=[
@@ -160,6 +152,8 @@ class BinanceDataFetcher:
         Dictionary containing DataFrames for each timeframe
         """
 
+        import pandas as pd
+
         logging.info(f"loading ohlcv data from path {self.data_path}")
         timeframes = ["15m", "1h", "4h", "1d"]
 
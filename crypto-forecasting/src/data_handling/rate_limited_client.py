@@ -0,0 +1,288 @@
+import itertools
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+
+import requests
+
+
+class Priority(IntEnum):
+    """Lower values are dispatched first."""
+
+    LIVE = 0
+    BACKFILL = 10
+
+
+class RequestFailedError(Exception):
+    """Raised when a request fails permanently or runs out of retries."""
+
+
+class CircuitOpenError(RequestFailedError):
+    """Raised when the circuit breaker rejects a request without sending it."""
+
+
+class TokenBucket:
+
+    def __init__(self, capacity: int, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.last_refill = now
+
+    def acquire(self, weight: int) -> None:
+        """Block until `weight` tokens are available, then consume them."""
+
+        weight = min(weight, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = (weight - self.tokens) / self.refill_per_second
+            time.sleep(wait)
+
+    def sync(self, used_weight: int) -> None:
+        """Align the local budget with the weight the server reports as used."""
+
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, max(0.0, self.capacity - used_weight))
+
+    def drain(self) -> None:
+        with self.lock:
+            self.tokens = 0.0
+            self.last_refill = time.monotonic()
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Closed: allow everything. Open: reject until the reset timeout passed,
+        then let requests through again (half-open) until the next outcome.
+        """
+
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logging.info(
+                        f"Circuit opened after {self.failures} consecutive failures"
+                    )
+                self.opened_at = time.monotonic()
+
+
+class _Job:
+
+    def __init__(self, url, params, weight, priority):
+        self.url = url
+        self.params = params
+        self.weight = weight
+        self.priority = priority
+        self.attempt = 0
+        self.future = Future()
+
+
+class RateLimitedClient:
+    """
+    HTTP client for weight-based rate limited APIs such as Binance.
+
+    Requests are queued by priority and sent by a single dispatcher thread that
+    spends a token bucket sized to the per-minute weight limit. Retryable
+    failures are re-queued after a jittered exponential backoff instead of
+    blocking the dispatcher, so higher priority requests can go first.
+    418/429 responses pause all dispatching until the server's Retry-After
+    passed and repeated failures open a circuit breaker.
+    """
+
+    RETRYABLE_STATUS = {500, 502, 503, 504}
+    BAN_STATUS = {418, 429}
+
+    def __init__(
+        self,
+        weight_per_minute: int = 6000,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        timeout: float = 10.0,
+        session=None,
+    ):
+        self.bucket = TokenBucket(weight_per_minute, weight_per_minute / 60)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.banned_until = 0.0
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def submit(self, url, params=None, weight=1, priority=Priority.BACKFILL) -> Future:
+        """Queue a GET request, the returned future resolves to the decoded json."""
+
+        job = _Job(url, params, weight, priority)
+        self._enqueue(job)
+        self._ensure_dispatcher()
+        return job.future
+
+    def get(self, url, params=None, weight=1, priority=Priority.BACKFILL):
+        """Send a GET request through the scheduler and wait for the json."""
+
+        return self.submit(url, params, weight, priority).result()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full jitter: uniform between 0 and the capped exponential delay."""
+
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+    def _enqueue(self, job):
+        self._queue.put((job.priority, next(self._counter), job))
+
+    def _ensure_dispatcher(self):
+        with self._lock:
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, daemon=True
+                )
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            _, _, job = self._queue.get()
+            try:
+                self._process(job)
+            except RequestFailedError as e:
+                job.future.set_exception(e)
+            except Exception as e:
+                # callers only handle RequestFailedError, anything unexpected
+                # must fail the request instead of the whole fetch
+                error = RequestFailedError(f"Request to {job.url} failed: {e!r}")
+                error.__cause__ = e
+                job.future.set_exception(error)
+
+    def _process(self, job):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open, rejected request to {job.url}")
+
+        ban_wait = self.banned_until - time.time()
+        if ban_wait > 0:
+            time.sleep(ban_wait)
+        self.bucket.acquire(job.weight)
+
+        try:
+            response = self.session.get(
+                job.url, params=job.params, timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            self._retry(job, e)
+            return
+
+        used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used_weight is not None:
+            self.bucket.sync(int(used_weight))
+
+        if response.status_code in self.BAN_STATUS:
+            retry_after = int(response.headers.get("Retry-After", 60))
+            self.banned_until = max(self.banned_until, time.time() + retry_after)
+            self.bucket.drain()
+            logging.info(
+                f"Received {response.status_code}, pausing requests for "
+                f"{retry_after} seconds"
+            )
+            # the ban already delays the retry, no additional backoff needed
+            self._retry(job, f"HTTP {response.status_code}", delay=0.0)
+            return
+
+        if response.status_code in self.RETRYABLE_STATUS:
+            self.breaker.record_failure()
+            self._retry(job, f"HTTP {response.status_code}")
+            return
+
+        if response.status_code >= 400:
+            raise RequestFailedError(
+                f"HTTP {response.status_code} for {job.url}: {response.text}"
+            )
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise RequestFailedError(
+                f"Invalid json in the response of {job.url}: {e}"
+            ) from e
+
+        self.breaker.record_success()
+        job.future.set_result(data)
+
+    def _retry(self, job, reason, delay=None):
+        job.attempt += 1
+        if job.attempt > self.max_retries:
+            job.future.set_exception(
+                RequestFailedError(
+                    f"Giving up on {job.url} after {self.max_retries} retries: {reason}"
+                )
+            )
+            return
+
+        if delay is None:
+            delay = self.backoff_delay(job.attempt)
+        logging.info(f"Retrying request in {delay:.2f}s ({reason})")
+        if delay <= 0:
+            self._enqueue(job)
+            return
+        timer = threading.Timer(delay, self._enqueue, args=(job,))
+        timer.daemon = True
+        timer.start()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def shared_client() -> RateLimitedClient:
+    """
+    Process-wide client for the Binance API. All fetchers spend one weight
+    budget and share one queue, so live requests can pre-empt the backfill
+    requests of other fetchers.
+    """
+
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = RateLimitedClient(weight_per_minute=6000)
+        return _shared_client
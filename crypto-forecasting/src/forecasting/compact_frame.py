@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+
+def to_compact_frame(df, id_col="unique_id", time_col="ds"):
+    """
+    Convert a Nixtla training frame into its compact representation.
+
+    The series id becomes categorical, timestamps become int64 nanoseconds
+    since epoch and all value columns are downcast to float32, which roughly
+    halves the memory of a frame with many exogenous columns.
+
+    Args:
+        df: DataFrame in Nixtla format (unique_id, ds, y, features...)
+        id_col: Name of the series id column
+        time_col: Name of the timestamp column
+
+    Returns:
+        Compact copy of the DataFrame
+    """
+
+    value_cols = [col for col in df.columns if col not in (id_col, time_col)]
+    return pd.DataFrame(
+        {
+            id_col: df[id_col].astype("category"),
+            time_col: df[time_col].to_numpy().astype("datetime64[ns]").view(np.int64),
+            **{col: df[col].astype(np.float32) for col in value_cols},
+        },
+        index=df.index,
+    )
+
+
+def restore_frame(df, id_col="unique_id", time_col="ds"):
+    """
+    Restore string ids and datetime timestamps of a compact frame, e.g. for
+    plotting or merging with OHLCV data. Value columns keep their dtype.
+    """
+
+    restored = df.copy()
+    restored[id_col] = restored[id_col].astype(str)
+    restored[time_col] = pd.to_datetime(restored[time_col], unit="ns")
+    return restored
+
+
+def to_int_freq(freq):
+    """Convert a pandas frequency string into its step size in nanoseconds."""
+
+    return int(pd.to_timedelta(pd.tseries.frequencies.to_offset(freq)).value)
+
+
+def frame_memory_bytes(df):
+    """Return the deep memory usage of a DataFrame in bytes."""
+
+    return int(df.memory_usage(deep=True).sum())
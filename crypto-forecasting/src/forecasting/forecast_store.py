@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+import pandas as pd
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def model_fingerprint(config):
+    """
+    Create a short, stable fingerprint of a model configuration.
+
+    Args:
+        config: Dictionary with everything that defines the model
+
+    Returns:
+        Hex digest identifying the configuration
+    """
+
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def data_fingerprint(df):
+    """Create a fingerprint of the data a model was trained on."""
+
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+
+class ForecastStore:
+    """
+    Append-only store for forecast runs.
+
+    Every symbol is stored in its own SQLite partition under `root_path`.
+    A run records its forecast origin, the model and data fingerprints and all
+    predicted series (point forecast and quantiles) in long format. Both tables
+    are indexed by timeframe and time, so lookups by symbol and time range only
+    read the matching rows instead of scanning whole result files.
+    """
+
+    def __init__(self, root_path):
+        self.root_path = root_path
+
+    def _partition_path(self, symbol):
+        return os.path.join(self.root_path, f"{symbol}.sqlite")
+
+    def _connect(self, symbol):
+        os.makedirs(self.root_path, exist_ok=True)
+        conn = sqlite3.connect(self._partition_path(symbol))
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timeframe TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                model_fingerprint TEXT NOT NULL,
+                data_fingerprint TEXT,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS predictions (
+                run_id INTEGER NOT NULL REFERENCES runs(run_id),
+                timeframe TEXT NOT NULL,
+                ds TEXT NOT NULL,
+                series TEXT NOT NULL,
+                value REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_origin
+                ON runs (timeframe, origin);
+            CREATE INDEX IF NOT EXISTS idx_predictions_ds
+                ON predictions (timeframe, ds);
+            CREATE INDEX IF NOT EXISTS idx_predictions_run
+                ON predictions (run_id);
+            """)
+        return conn
+
+    def append(
+        self,
+        symbol,
+        timeframe,
+        forecast_df,
+        origin,
+        model_fingerprint,
+        data_fingerprint=None,
+    ):
+        """
+        Append a forecast run to the store.
+
+        Args:
+            symbol: Trading pair symbol (e.g., "ALGOUSDT")
+            timeframe: Timeframe of the forecast (e.g., "1h")
+            forecast_df: Forecast DataFrame with a ds column and one column per
+            predicted series (e.g., NHITS, NHITS-lo-80)
+            origin: Last timestamp of the data the forecast is based on
+            model_fingerprint: Fingerprint of the model configuration
+            data_fingerprint: Optional fingerprint of the training data
+
+        Returns:
+            The id of the stored run
+        """
+
+        series_cols = [
+            col for col in forecast_df.columns if col not in ("unique_id", "ds")
+        ]
+        predictions = forecast_df.melt(
+            id_vars=["ds"],
+            value_vars=series_cols,
+            var_name="series",
+            value_name="value",
+        )
+        predictions["ds"] = pd.to_datetime(predictions["ds"]).dt.strftime(TIME_FORMAT)
+
+        conn = self._connect(symbol)
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO runs (timeframe, origin, model_fingerprint, "
+                    "data_fingerprint, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        timeframe,
+                        pd.Timestamp(origin).strftime(TIME_FORMAT),
+                        model_fingerprint,
+                        data_fingerprint,
+                        datetime.now(timezone.utc).strftime(TIME_FORMAT),
+                    ),
+                )
+                run_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO predictions (run_id, timeframe, ds, series, value) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (run_id, timeframe, ds, series, float(value))
+                        for ds, series, value in predictions.itertuples(index=False)
+                    ),
+                )
+        finally:
+            conn.close()
+
+        logging.info(f"Stored forecast run {run_id} for {symbol} {timeframe}")
+        return run_id
+
+    def load_runs(self, symbol, timeframe=None, start=None, end=None):
+        """
+        Load the run metadata of a symbol, optionally filtered by timeframe
+        and a forecast origin range (inclusive).
+        """
+
+        query = "SELECT * FROM runs"
+        clauses, params = self._time_filter("origin", timeframe, start, end)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY origin, run_id"
+        return self._read(symbol, query, params, ["origin", "created_at"])
+
+    def load_forecasts(self, symbol, timeframe=None, start=None, end=None, run_id=None):
+        """
+        Load predictions of a symbol in wide format (one column per series).
+
+        Args:
+            symbol: Trading pair symbol (e.g., "ALGOUSDT")
+            timeframe: Optional timeframe filter
+            start: Optional start of the forecasted time range (inclusive)
+            end: Optional end of the forecasted time range (inclusive)
+            run_id: Optional run filter
+
+        Returns:
+            DataFrame with run_id, origin, model_fingerprint, ds and the series
+        """
+
+        clauses, params = self._time_filter("p.ds", timeframe, start, end, "p.")
+        if run_id is not None:
+            clauses.append("p.run_id = ?")
+            params.append(run_id)
+
+        query = (
+            "SELECT p.run_id, r.origin, r.model_fingerprint, p.ds, p.series, p.value "
+            "FROM predictions p JOIN runs r ON r.run_id = p.run_id"
+        )
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+
+        long_df = self._read(symbol, query, params, ["origin", "ds"])
+        if long_df.empty:
+            return long_df
+
+        wide_df = long_df.pivot(
+            index=["run_id", "origin", "model_fingerprint", "ds"],
+            columns="series",
+            values="value",
+        ).reset_index()
+        wide_df.columns.name = None
+        return wide_df.sort_values(["run_id", "ds"], ignore_index=True)
+
+    def latest_forecast(self, symbol, timeframe):
+        """Load the predictions of the most recent run of a symbol and timeframe."""
+
+        runs = self.load_runs(symbol, timeframe)
+        if runs.empty:
+            return runs
+        return self.load_forecasts(symbol, timeframe, run_id=int(runs["run_id"].max()))
+
+    def _time_filter(self, column, timeframe, start, end, prefix=""):
+        clauses, params = [], []
+        if timeframe is not None:
+            clauses.append(f"{prefix}timeframe = ?")
+            params.append(timeframe)
+        if start is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(pd.Timestamp(start).strftime(TIME_FORMAT))
+        if end is not None:
+            clauses.append(f"{column} <= ?")
+            params.append(pd.Timestamp(end).strftime(TIME_FORMAT))
+        return clauses, params
+
+    def _read(self, symbol, query, params, date_columns):
+        if not os.path.exists(self._partition_path(symbol)):
+            return pd.DataFrame()
+
+        conn = self._connect(symbol)
+        try:
+            df = pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+
+        for col in date_columns:
+            df[col] = pd.to_datetime(df[col])
+        return df
@@ -1,25 +1,44 @@
 import os
+import json
 import logging
 import pandas as pd
-from neuralforecast import NeuralForecast
-from neuralforecast.models import NHITS
-from neuralforecast.losses.pytorch import MAE
 from data_handling.data_fetcher import BinanceDataFetcher
 from data_handling.feature_creation import FeatureCreator
-from forecasting.result_plotting import ResultPlotter
+from forecasting.compact_frame import to_compact_frame, restore_frame, to_int_freq
+from forecasting.forecast_store import (
+    ForecastStore,
+    model_fingerprint,
+    data_fingerprint,
+)
 
 
 class NHitsForecaster:
 
-    def __init__(self, symbol="ALGOUSDT", timeframe="1h"):
-        """Initialize the forecaster with improved configurations."""
+    def __init__(
+        self, symbol="ALGOUSDT", timeframe="1h", compact_frames=False, levels=None
+    ):
+        """
+        Initialize the forecaster with improved configurations.
+
+        Args:
+        symbol: Trading pair symbol (e.g., "ALGOUSDT")
+        timeframe: Timeframe of the candles to forecast
+        compact_frames: Train on float32 features, a categorical unique_id and
+        int64 timestamps to save memory when packing many symbols
+        levels: Optional prediction interval levels (e.g. [80, 90]), trains a
+        single multi-quantile model that yields the median and all intervals
+        """
 
         self.symbol = symbol
         self.timeframe = timeframe
+        self.compact_frames = compact_frames
+        self.levels = levels
         self.use_gpu = bool(os.environ.get("USE_GPU"))
         self.output_path = str(os.environ.get("OUTPUT_PATH"))
         self.fetcher = BinanceDataFetcher()
+        self.store = ForecastStore(f"{self.output_path}/forecasts")
         self.model = None
+        self.model_fingerprint = None
         self.y_df = None
         self.ohlcv_df = None
         self.forecast_df = None
@@ -54,7 +73,6 @@ class NHitsForecaster:
             if self.timeframe not in data_dict:
                 raise ValueError(f"No data found for {self.timeframe}")
             ohlcv_df = data_dict[self.timeframe]
-            self.ohlcv_df = ohlcv_df
         except Exception as e:
             logging.info(f"Error loading existing data: {e}")
             logging.info("Fetching new data from Binance...")
@@ -62,6 +80,7 @@ class NHitsForecaster:
                 symbol=self.symbol, timeframe_filter=self.timeframe
             )
             ohlcv_df = data_dict[self.timeframe]
+        self.ohlcv_df = ohlcv_df
 
         f_engineer = FeatureCreator(self.ohlcv_df)
         df_features = f_engineer.create_nhits_features()
@@ -89,52 +108,126 @@ class NHitsForecaster:
         )
 
         y_df = y_df.dropna()
+        if self.compact_frames:
+            y_df = to_compact_frame(y_df)
         self.y_df = y_df
         logging.info("Preparation successful")
         return y_df
 
-    def train_model(self):
-        """
-        Train the NHITS model with simplified configuration.
+    def create_model(self):
         """
-        # Get data with enhanced features
-
-        if self.y_df is None:
-            raise ValueError("Error loading data for training")
+        Create the NHITS model and its NeuralForecast wrapper for the current
+        timeframe without training it.
 
-        data_df = self.y_df
+        Returns:
+        Unfitted NeuralForecast instance
+        """
+        # neuralforecast pulls in torch, only import it when a model is needed
+        from neuralforecast import NeuralForecast
+        from neuralforecast.models import NHITS
+        from neuralforecast.losses.pytorch import MAE, MQLoss
 
         # Get configuration for this timeframe
         config = self.timeframe_configs[self.timeframe]
         horizon = config["horizon"]
         input_size = config["input_size"]
         freq = config["freq"]
+        # compact frames use int64 timestamps, which require an integer step
+        if self.compact_frames:
+            freq = to_int_freq(freq)
+
+        # The median of the multi-quantile loss matches the MAE point forecast
+        loss = MQLoss(level=self.levels) if self.levels else MAE()
 
         # Create NHITS model with simpler configuration
+        model_params = {
+            "h": horizon,
+            "input_size": input_size,
+            "max_steps": 1000,
+            "val_check_steps": 50,
+            "early_stop_patience_steps": 0,  # Disable early stopping with 0
+            "dropout_prob_theta": 0.1,
+            "n_blocks": [1, 1, 1],
+            "n_pool_kernel_size": [2, 2, 2],
+            "n_freq_downsample": [2, 2, 1],
+            "scaler_type": "minmax",  # best results
+            "random_seed": 42,
+        }
         model = NHITS(
-            h=horizon,
-            input_size=input_size,
-            loss=MAE(),
-            max_steps=1000,
-            val_check_steps=50,
-            early_stop_patience_steps=0,  # Disable early stopping with 0
-            dropout_prob_theta=0.1,
-            n_blocks=[1, 1, 1],
-            n_pool_kernel_size=[2, 2, 2],
-            n_freq_downsample=[2, 2, 1],
-            scaler_type="minmax",  # best results
-            random_seed=42,
+            loss=loss,
             accelerator="gpu" if self.use_gpu else "cpu",
+            **model_params,
         )
+        self.model_fingerprint = model_fingerprint(
+            {
+                "model": "NHITS",
+                "loss": type(loss).__name__,
+                "levels": self.levels,
+                "freq": config["freq"],
+                **model_params,
+            }
+        )
+
+        return NeuralForecast(models=[model], freq=freq)
+
+    def train_model(self):
+        """
+        Train the NHITS model with simplified configuration.
+        """
+        # Get data with enhanced features
+
+        if self.y_df is None:
+            raise ValueError("Error loading data for training")
+
+        data_df = self.y_df
 
         # Initialize and train model
-        nf = NeuralForecast(models=[model], freq=freq)
+        nf = self.create_model()
         logging.info("Training model... (this may take several minutes)")
         nf.fit(df=data_df)
 
         # Store the model
         self.model = nf
 
+    def get_model_path(self):
+        return f"{self.output_path}/models/{self.symbol}_{self.timeframe}"
+
+    def save_model(self):
+        """
+        Save the trained model and the settings required to reuse it.
+        """
+
+        if self.model is None:
+            raise ValueError("Model has not been trained. Call train_model() first.")
+
+        model_path = self.get_model_path()
+        self.model.save(path=model_path, overwrite=True, save_dataset=True)
+        with open(f"{model_path}/forecaster.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "model_fingerprint": self.model_fingerprint,
+                    "compact_frames": self.compact_frames,
+                    "levels": self.levels,
+                },
+                f,
+            )
+        logging.info(f"Model saved to {model_path}")
+
+    def load_model(self):
+        """
+        Load a model saved by save_model() for the current symbol and timeframe.
+        """
+        from neuralforecast import NeuralForecast
+
+        model_path = self.get_model_path()
+        self.model = NeuralForecast.load(path=model_path)
+        with open(f"{model_path}/forecaster.json", "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        self.model_fingerprint = settings["model_fingerprint"]
+        self.compact_frames = settings["compact_frames"]
+        self.levels = settings["levels"]
+        logging.info(f"Model loaded from {model_path}")
+
     def predict(self):
         """
         Generate forecasts using the trained model.
@@ -142,19 +235,82 @@ class NHitsForecaster:
 
         if self.model is None:
             raise ValueError("Model has not been trained. Call train_model() first.")
+        if self.y_df is None:
+            raise ValueError("Error loading data for prediction")
 
-        # Generate forecasts
+        # Generate forecasts from the prepared data, a loaded model would
+        # otherwise forecast from the dataset saved at training time
         logging.info("Generating forecasts...")
-        forecasts = self.model.predict()
+        forecasts = self.model.predict(df=self.y_df)
 
-        # Clean column names
+        # Clean column names, quantile columns keep their -lo-/-hi- suffix
         forecasts.columns = forecasts.columns.str.replace("-median", "")
+        if self.compact_frames:
+            forecasts = restore_frame(forecasts)
 
-        # Store forecasts
+        # Store forecasts, previous runs are kept in the store
         self.forecast_df = forecasts
-        save_path = f"{self.output_path}/forecasts/{self.symbol}_forecast_df.csv"
-        forecasts.to_csv(save_path)
-        logging.info(f"Prediction successful, forecasting df saved to {save_path}")
+        run_id = self.store.append(
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            forecast_df=forecasts,
+            origin=pd.to_datetime(self.y_df["ds"].max(), unit="ns"),
+            model_fingerprint=self.model_fingerprint,
+            data_fingerprint=data_fingerprint(self.y_df),
+        )
+        logging.info(
+            f"Prediction successful, stored as run {run_id} in {self.store.root_path}"
+        )
+
+    def plot_forecast(self):
+        """
+        Plot the current forecast, or the latest stored forecast if predict()
+        was not called in this run.
+        """
+        from forecasting.result_plotting import ResultPlotter
+
+        if self.y_df is None:
+            raise ValueError("Error loading data for plotting")
+
+        if self.forecast_df is None:
+            self.forecast_df = self.store.latest_forecast(self.symbol, self.timeframe)
+            if self.forecast_df.empty:
+                raise ValueError(f"No stored forecast for {self.symbol}")
+
+        y_df = restore_frame(self.y_df) if self.compact_frames else self.y_df
+        plotter = ResultPlotter(self.symbol, self.ohlcv_df, y_df, self.forecast_df)
+        return plotter.plot_absolute_prices(
+            timeframe_configs=self.timeframe_configs, timeframe=self.timeframe
+        )
+
+    def backtest(self, n_windows=3):
+        """
+        Evaluate the model configuration with rolling cross-validation.
+
+        Args:
+        n_windows: Number of forecast windows, each one horizon apart
+
+        Returns:
+        DataFrame with actual and forecasted returns per window
+        """
+
+        if self.y_df is None:
+            raise ValueError("Error loading data for backtesting")
+
+        nf = self.create_model()
+        horizon = self.timeframe_configs[self.timeframe]["horizon"]
+        logging.info(f"Backtesting over {n_windows} windows...")
+        cv_df = nf.cross_validation(
+            df=self.y_df, n_windows=n_windows, step_size=horizon
+        )
+        cv_df.columns = cv_df.columns.str.replace("-median", "")
+        if self.compact_frames:
+            cv_df = restore_frame(cv_df)
+
+        mae = (cv_df["y"] - cv_df["NHITS"]).abs().mean()
+        hit_rate = ((cv_df["y"] > 0) == (cv_df["NHITS"] > 0)).mean()
+        logging.info(f"Backtest MAE: {mae:.6f}, direction hit rate: {hit_rate:.2%}")
+        return cv_df
 
     def run_forecast(self):
         """
@@ -175,12 +331,7 @@ class NHitsForecaster:
 
             # Plot forecasts
             logging.info("Step 4: Creating visualization...")
-            plotter = ResultPlotter(
-                self.symbol, self.ohlcv_df, self.y_df, self.forecast_df
-            )
-            plotter.plot_absolute_prices(
-                timeframe_configs=self.timeframe_configs, timeframe=self.timeframe
-            )
+            self.plot_forecast()
 
             logging.info("Forecasting pipeline successful")
         except Exception as e:
@@ -1,5 +1,6 @@
 import logging
 import os
+import re
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
@@ -55,25 +56,46 @@ class ResultPlotter:
         y_df_with_prices = pd.merge(y_df_copy, historical_prices, on="ds", how="left")
 
         # For forecast data, we need to calculate prices based on returns
-        # Initialize the first forecasted price using the last known price
-        current_price = last_price
-        forecast_df_copy["absolute_price"] = None
-
-        # The forecast column name in forecast_df
-        forecast_column = f"NHITS"
-
-        # Calculate absolute prices for each forecasted period
-        for idx, row in forecast_df_copy.iterrows():
-            # Apply the forecasted return to get the next price
-            # If return is 0.01 (1%), then new_price = current_price * (1 + 0.01)
-            return_value = row[forecast_column]
-            new_price = current_price * (1 + return_value)
-            forecast_df_copy.at[idx, "absolute_price"] = new_price
-            current_price = new_price
+        # If return is 0.01 (1%), then new_price = current_price * (1 + 0.01)
+        forecast_df_copy["absolute_price"] = self._compound_returns(
+            forecast_df_copy["NHITS"], last_price
+        )
+
+        # Quantile paths are compounded the same way, assuming the quantiles of
+        # consecutive steps move together. This gives a conservative fan.
+        for level in self.get_forecast_levels():
+            for side in ["lo", "hi"]:
+                forecast_df_copy[f"absolute_price-{side}-{level}"] = (
+                    self._compound_returns(
+                        forecast_df_copy[f"NHITS-{side}-{level}"], last_price
+                    )
+                )
 
         logging.info("Conversion successful")
         return y_df_with_prices, forecast_df_copy
 
+    def get_forecast_levels(self):
+        """
+        Get the prediction interval levels contained in the forecast data.
+
+        Returns:
+        --------
+        list of str
+            Levels (e.g. "80", "90") with a lo and hi column, sorted ascending
+        """
+
+        levels = []
+        for col in self.forecast_df.columns:
+            match = re.fullmatch(r"NHITS-lo-([\d.]+)", col)
+            if match and f"NHITS-hi-{match.group(1)}" in self.forecast_df.columns:
+                levels.append(match.group(1))
+        return sorted(levels, key=float)
+
+    def _compound_returns(self, returns, start_price):
+        """Compound a series of returns into absolute prices."""
+
+        return start_price * (1 + returns.astype(float)).cumprod()
+
     def plot_absolute_prices(
         self, figsize=(14, 7), title=None, timeframe_configs=None, timeframe="1h"
     ):
@@ -135,6 +157,19 @@ class ResultPlotter:
             linewidth=2,
         )
 
+        # Plot prediction intervals as fan, widest level first
+        levels = self.get_forecast_levels()
+        for i, level in enumerate(reversed(levels)):
+            ax.fill_between(
+                forecast_df["ds"],
+                forecast_df[f"absolute_price-lo-{level}"],
+                forecast_df[f"absolute_price-hi-{level}"],
+                color="red",
+                alpha=0.1 + 0.15 * i,
+                linewidth=0,
+                label=f"{level}% interval",
+            )
+
         # Add vertical line to mark the separation between historical and forecast
         ax.axvline(x=last_date, color="gray", linestyle="-", linewidth=1)
 
@@ -1,10 +1,164 @@
+import argparse
+import logging
 import os
-from forecasting.nhits_forecast import NHitsForecaster
 from dotenv import load_dotenv
 
 os.environ["DATA_PATH"] = "resources/data"
 os.environ["OUTPUT_PATH"] = "resources/results"
 load_dotenv()
 
+# Heavy dependencies (pandas, ta, matplotlib, neuralforecast/torch) are only
+# imported inside the subcommands that need them, so that e.g. cron driven
+# fetch jobs do not pay for loading torch.
+
+
+def create_forecaster(args):
+    from forecasting.nhits_forecast import NHitsForecaster
+
+    return NHitsForecaster(
+        symbol=args.symbol,
+        timeframe=args.timeframe,
+        compact_frames=getattr(args, "compact", False),
+        levels=getattr(args, "levels", None),
+    )
+
+
+def fetch(args):
+    from data_handling.data_fetcher import BinanceDataFetcher
+    from data_handling.rate_limited_client import Priority
+
+    priority = Priority.LIVE if args.live else Priority.BACKFILL
+    BinanceDataFetcher().fetch_multi_timeframe(
+        symbol=args.symbol, timeframe_filter=args.timeframe, priority=priority
+    )
+
+
+def features(args):
+    from data_handling.data_fetcher import BinanceDataFetcher
+    from data_handling.feature_creation import FeatureCreator
+
+    data_dict = BinanceDataFetcher().load_multi_timeframe_from_csv(
+        args.symbol, timeframe_filter=args.timeframe
+    )
+    if args.timeframe not in data_dict:
+        raise ValueError(f"No data found for {args.timeframe}, run fetch first")
+    FeatureCreator(data_dict[args.timeframe]).create_nhits_features()
+
+
+def train(args):
+    forecaster = create_forecaster(args)
+    forecaster.prepare_data()
+    forecaster.train_model()
+    forecaster.save_model()
+
+
+def predict(args):
+    forecaster = create_forecaster(args)
+    # the saved settings (e.g. compact_frames) decide how the data is prepared
+    forecaster.load_model()
+    forecaster.prepare_data()
+    forecaster.predict()
+
+
+def plot(args):
+    forecaster = create_forecaster(args)
+    forecaster.prepare_data()
+    forecaster.plot_forecast()
+
+
+def backtest(args):
+    forecaster = create_forecaster(args)
+    forecaster.prepare_data()
+    forecaster.backtest(n_windows=args.windows)
+
+
+def run(args):
+    create_forecaster(args).run_forecast()
+
+
+def add_common_arguments(parser, default_timeframe="1h"):
+    parser.add_argument(
+        "--symbol", type=str, default="ALGOUSDT", help="Trading pair symbol"
+    )
+    parser.add_argument(
+        "--timeframe",
+        type=str,
+        default=default_timeframe,
+        choices=["15m", "1h", "4h", "1d"],
+        help=f"Timeframe of the candles (default: {default_timeframe or 'all'})",
+    )
+
+
+def add_model_arguments(parser):
+    parser.add_argument(
+        "--compact", action="store_true", help="Train on compact float32 frames"
+    )
+    parser.add_argument(
+        "--levels",
+        type=int,
+        nargs="+",
+        help="Prediction interval levels, e.g. --levels 80 90",
+    )
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(description="Crypto forecasting with NHITS")
+    subparsers = parser.add_subparsers(dest="command")
+
+    # fetch all timeframes unless one is given
+    fetch_parser = subparsers.add_parser("fetch", help="Fetch OHLCV data from Binance")
+    add_common_arguments(fetch_parser, default_timeframe=None)
+    fetch_parser.add_argument(
+        "--live", action="store_true", help="Schedule requests before backfills"
+    )
+    fetch_parser.set_defaults(func=fetch)
+
+    features_parser = subparsers.add_parser(
+        "features", help="Create features from stored data"
+    )
+    add_common_arguments(features_parser)
+    features_parser.set_defaults(func=features)
+
+    train_parser = subparsers.add_parser("train", help="Train and save a model")
+    add_common_arguments(train_parser)
+    add_model_arguments(train_parser)
+    train_parser.set_defaults(func=train)
+
+    predict_parser = subparsers.add_parser(
+        "predict", help="Forecast with a saved model"
+    )
+    add_common_arguments(predict_parser)
+    predict_parser.set_defaults(func=predict)
+
+    plot_parser = subparsers.add_parser("plot", help="Plot the latest stored forecast")
+    add_common_arguments(plot_parser)
+    plot_parser.set_defaults(func=plot)
+
+    backtest_parser = subparsers.add_parser("backtest", help="Cross-validate the model")
+    add_common_arguments(backtest_parser)
+    add_model_arguments(backtest_parser)
+    backtest_parser.add_argument(
+        "--windows", type=int, default=3, help="Number of backtest windows"
+    )
+    backtest_parser.set_defaults(func=backtest)
+
+    run_parser = subparsers.add_parser("run", help="Run the complete pipeline")
+    add_common_arguments(run_parser)
+    add_model_arguments(run_parser)
+    run_parser.set_defaults(func=run)
+
+    return parser
+
+
 if __name__ == "__main__":
-    NHitsForecaster().run_forecast()
\ No newline at end of file
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+    args = create_parser().parse_args()
+    # without a subcommand run the complete pipeline as before
+    if args.command is None:
+        args = create_parser().parse_args(["run"])
+    args.func(args)
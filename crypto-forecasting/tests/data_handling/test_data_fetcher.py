@@ -0,0 +1,34 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# the fetcher imports its siblings like main.py does, from within src
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from data_handling.data_fetcher import BinanceDataFetcher
+from data_handling.rate_limited_client import Priority, shared_client
+
+
+class TestBinanceDataFetcher(unittest.TestCase):
+    def test_fetchers_share_the_client(self):
+        """Test all fetchers of the process send through one rate limited client."""
+        self.assertIs(BinanceDataFetcher().client, shared_client())
+        self.assertIs(BinanceDataFetcher().client, BinanceDataFetcher().client)
+
+    def test_injected_client(self):
+        """Test requests go through an injected client with the given priority."""
+        client = MagicMock()
+        client.get.return_value = []
+        fetcher = BinanceDataFetcher(client=client)
+
+        self.assertEqual(
+            fetcher.fetch_multi_timeframe("BTCUSDT", "1d", priority=Priority.LIVE), {}
+        )
+        client.get.assert_called_once()
+        self.assertEqual(client.get.call_args.kwargs["priority"], Priority.LIVE)
+        self.assertEqual(client.get.call_args.kwargs["params"]["symbol"], "BTCUSDT")
+
+
+if __name__ == "__main__":
+    unittest.main()
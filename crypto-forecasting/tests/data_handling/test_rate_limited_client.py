@@ -0,0 +1,225 @@
+import unittest
+import threading
+import logging
+from unittest.mock import MagicMock
+
+import requests
+
+from src.data_handling.rate_limited_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Priority,
+    RateLimitedClient,
+    RequestFailedError,
+    TokenBucket,
+    shared_client,
+)
+
+
+def make_response(status_code=200, json_data=None, headers=None):
+    """Create a mocked requests response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = json_data
+    response.headers = headers or {}
+    response.text = ""
+    return response
+
+
+class TestRateLimitedClient(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment before each test method."""
+        self.session = MagicMock()
+        self.client = RateLimitedClient(
+            weight_per_minute=6000,
+            max_retries=3,
+            backoff_base=0.001,
+            backoff_cap=0.01,
+            failure_threshold=10,
+            session=self.session,
+        )
+
+        # Disable logging during tests
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        logging.disable(logging.NOTSET)
+
+    def test_get_returns_json(self):
+        """Test a successful request returns the decoded json."""
+        self.session.get.return_value = make_response(json_data=[[1, 2]])
+
+        result = self.client.get("http://test", params={"a": 1}, weight=2)
+
+        self.assertEqual(result, [[1, 2]])
+        self.session.get.assert_called_once()
+
+    def test_retries_transient_errors(self):
+        """Test server errors and network errors are retried until success."""
+        self.session.get.side_effect = [
+            make_response(status_code=503),
+            requests.ConnectionError("reset"),
+            make_response(json_data=["ok"]),
+        ]
+
+        result = self.client.get("http://test")
+
+        self.assertEqual(result, ["ok"])
+        self.assertEqual(self.session.get.call_count, 3)
+
+    def test_gives_up_after_max_retries(self):
+        """Test persistent errors fail instead of looping forever."""
+        self.session.get.return_value = make_response(status_code=500)
+
+        with self.assertRaises(RequestFailedError):
+            self.client.get("http://test")
+
+        # initial attempt plus max_retries
+        self.assertEqual(self.session.get.call_count, 4)
+
+    def test_client_errors_are_not_retried(self):
+        """Test a 400 response fails immediately."""
+        self.session.get.return_value = make_response(status_code=400)
+
+        with self.assertRaises(RequestFailedError):
+            self.client.get("http://test")
+
+        self.session.get.assert_called_once()
+
+    def test_invalid_json_fails_the_request(self):
+        """Test a 2xx response without json fails with RequestFailedError."""
+        response = make_response()
+        response.json.side_effect = ValueError("Expecting value")
+        self.session.get.return_value = response
+
+        with self.assertRaises(RequestFailedError):
+            self.client.get("http://test")
+
+    def test_unexpected_errors_fail_the_request(self):
+        """Test unexpected exceptions are raised as RequestFailedError."""
+        self.session.get.return_value = make_response(
+            headers={"X-MBX-USED-WEIGHT-1M": "not a number"}
+        )
+
+        with self.assertRaises(RequestFailedError) as context:
+            self.client.get("http://test")
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+
+        # the dispatcher keeps running for the next request
+        self.session.get.return_value = make_response(json_data=["ok"])
+        self.assertEqual(self.client.get("http://test"), ["ok"])
+
+    def test_ban_pauses_dispatching(self):
+        """Test a 429 response sets the ban window and retries after it."""
+        self.session.get.side_effect = [
+            make_response(status_code=429, headers={"Retry-After": "0"}),
+            make_response(json_data=["ok"]),
+        ]
+
+        result = self.client.get("http://test")
+
+        self.assertEqual(result, ["ok"])
+        self.assertGreater(self.client.banned_until, 0)
+        # a ban is not a failure of the remote service
+        self.assertEqual(self.client.breaker.failures, 0)
+
+    def test_used_weight_header_syncs_bucket(self):
+        """Test the server reported weight reduces the local budget."""
+        self.session.get.return_value = make_response(
+            json_data=[], headers={"X-MBX-USED-WEIGHT-1M": "5000"}
+        )
+
+        self.client.get("http://test")
+
+        self.assertLessEqual(self.client.bucket.tokens, 1001)
+
+    def test_circuit_breaker_rejects_requests(self):
+        """Test an open circuit fails fast without sending the request."""
+        self.client.breaker.failures = self.client.breaker.failure_threshold
+        self.client.breaker.record_failure()
+
+        with self.assertRaises(CircuitOpenError):
+            self.client.get("http://test")
+
+        self.session.get.assert_not_called()
+
+    def test_live_requests_preempt_backfill(self):
+        """Test queued live requests are dispatched before queued backfills."""
+        order = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def fake_get(url, params=None, timeout=None):
+            if url == "http://blocker":
+                started.set()
+                release.wait(1)
+            order.append(url)
+            return make_response(json_data=[])
+
+        self.session.get.side_effect = fake_get
+
+        # the blocker occupies the dispatcher while the others are queued
+        blocker = self.client.submit("http://blocker", priority=Priority.BACKFILL)
+        started.wait(1)
+        backfill = self.client.submit("http://backfill", priority=Priority.BACKFILL)
+        live = self.client.submit("http://live", priority=Priority.LIVE)
+        release.set()
+
+        for future in (blocker, backfill, live):
+            future.result(timeout=2)
+
+        self.assertEqual(order, ["http://blocker", "http://live", "http://backfill"])
+
+
+class TestSharedClient(unittest.TestCase):
+    def test_one_client_per_process(self):
+        """Test every caller gets the same client and with it the same budget."""
+        client = shared_client()
+
+        self.assertIsInstance(client, RateLimitedClient)
+        self.assertIs(shared_client(), client)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_acquire_consumes_tokens(self):
+        """Test acquiring weight reduces the available tokens."""
+        bucket = TokenBucket(capacity=10, refill_per_second=1)
+
+        bucket.acquire(4)
+
+        self.assertAlmostEqual(bucket.tokens, 6, delta=0.1)
+
+    def test_sync_caps_tokens(self):
+        """Test syncing with the server usage caps the remaining tokens."""
+        bucket = TokenBucket(capacity=100, refill_per_second=1)
+
+        bucket.sync(90)
+
+        self.assertLessEqual(bucket.tokens, 10.1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_resets(self):
+        """Test the breaker opens after consecutive failures and closes on success."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_after_timeout(self):
+        """Test requests are allowed again once the reset timeout passed."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+
+        breaker.record_failure()
+
+        self.assertTrue(breaker.allow())
+
+
+if __name__ == "__main__":
+    unittest.main()
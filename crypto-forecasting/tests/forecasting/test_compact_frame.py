@@ -0,0 +1,67 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+from src.forecasting.compact_frame import (
+    to_compact_frame,
+    restore_frame,
+    to_int_freq,
+    frame_memory_bytes,
+)
+
+
+class TestCompactFrame(unittest.TestCase):
+    def setUp(self):
+        """Set up a Nixtla style training frame."""
+        periods = 200
+        random_state = np.random.RandomState(42)
+        self.y_df = pd.DataFrame(
+            {
+                "unique_id": "ALGOUSDT_1h",
+                "ds": pd.date_range(start="2024-01-01", periods=periods, freq="h"),
+                "y": random_state.normal(0, 0.01, periods),
+                "close": random_state.uniform(0.1, 0.2, periods),
+                "rsi_14": random_state.uniform(0, 100, periods),
+            }
+        )
+
+    def test_to_compact_frame_dtypes(self):
+        """Test the compact frame uses the compact dtypes."""
+        compact = to_compact_frame(self.y_df)
+
+        self.assertIsInstance(compact["unique_id"].dtype, pd.CategoricalDtype)
+        self.assertEqual(compact["ds"].dtype, np.int64)
+        for col in ["y", "close", "rsi_14"]:
+            self.assertEqual(compact[col].dtype, np.float32)
+
+        # Original frame is untouched
+        self.assertEqual(self.y_df["y"].dtype, np.float64)
+
+    def test_compact_frame_saves_memory(self):
+        """Test the compact frame needs less memory."""
+        compact = to_compact_frame(self.y_df)
+
+        self.assertLess(frame_memory_bytes(compact), frame_memory_bytes(self.y_df))
+
+    def test_restore_frame_roundtrip(self):
+        """Test ids and timestamps survive a compact roundtrip."""
+        restored = restore_frame(to_compact_frame(self.y_df))
+
+        pd.testing.assert_series_equal(restored["ds"], self.y_df["ds"])
+        pd.testing.assert_series_equal(restored["unique_id"], self.y_df["unique_id"])
+        np.testing.assert_allclose(restored["y"], self.y_df["y"], rtol=1e-6)
+
+    def test_to_int_freq(self):
+        """Test frequency strings are converted to nanosecond steps."""
+        self.assertEqual(to_int_freq("15min"), 15 * 60 * 10**9)
+        self.assertEqual(to_int_freq("h"), 3600 * 10**9)
+        self.assertEqual(to_int_freq("4h"), 4 * 3600 * 10**9)
+        self.assertEqual(to_int_freq("D"), 86400 * 10**9)
+
+        # steps between compact timestamps match the frequency
+        compact = to_compact_frame(self.y_df)
+        self.assertTrue((compact["ds"].diff().dropna() == to_int_freq("h")).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import shutil
+import tempfile
+import logging
+import pandas as pd
+import numpy as np
+
+from src.forecasting.forecast_store import (
+    ForecastStore,
+    model_fingerprint,
+    data_fingerprint,
+)
+
+
+class TestForecastStore(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary store before each test method."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = ForecastStore(self.temp_dir)
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        logging.disable(logging.NOTSET)
+
+    def create_forecast_df(self, origin, horizon=24, levels=()):
+        """Create a forecast DataFrame in the format returned by predict()."""
+        ds = pd.date_range(start=origin, periods=horizon + 1, freq="h")[1:]
+        forecast_df = pd.DataFrame(
+            {
+                "unique_id": "ALGOUSDT_1h",
+                "ds": ds,
+                "NHITS": np.linspace(-0.01, 0.01, horizon),
+            }
+        )
+        for level in levels:
+            forecast_df[f"NHITS-lo-{level}"] = forecast_df["NHITS"] - 0.01
+            forecast_df[f"NHITS-hi-{level}"] = forecast_df["NHITS"] + 0.01
+        return forecast_df
+
+    def test_append_keeps_history(self):
+        """Test every run is kept instead of overwriting the previous one."""
+        first = self.store.append(
+            "ALGOUSDT", "1h", self.create_forecast_df("2025-02-01"), "2025-02-01", "a"
+        )
+        second = self.store.append(
+            "ALGOUSDT", "1h", self.create_forecast_df("2025-02-02"), "2025-02-02", "b"
+        )
+
+        runs = self.store.load_runs("ALGOUSDT")
+        self.assertEqual(list(runs["run_id"]), [first, second])
+        self.assertEqual(list(runs["model_fingerprint"]), ["a", "b"])
+        self.assertEqual(len(self.store.load_forecasts("ALGOUSDT")), 48)
+
+    def test_load_forecasts_roundtrip(self):
+        """Test stored predictions are returned in wide format."""
+        forecast_df = self.create_forecast_df("2025-02-01", levels=[80])
+        run_id = self.store.append(
+            "ALGOUSDT", "1h", forecast_df, "2025-02-01", "fp", "data"
+        )
+
+        loaded = self.store.load_forecasts("ALGOUSDT", run_id=run_id)
+
+        for col in ["NHITS", "NHITS-lo-80", "NHITS-hi-80"]:
+            np.testing.assert_allclose(loaded[col], forecast_df[col])
+        pd.testing.assert_series_equal(
+            loaded["ds"], forecast_df["ds"], check_names=False, check_freq=False
+        )
+        self.assertTrue((loaded["origin"] == pd.Timestamp("2025-02-01")).all())
+
+    def test_time_range_and_timeframe_filters(self):
+        """Test lookups only return rows in the requested range."""
+        self.store.append(
+            "ALGOUSDT", "1h", self.create_forecast_df("2025-02-01"), "2025-02-01", "a"
+        )
+        self.store.append(
+            "ALGOUSDT", "4h", self.create_forecast_df("2025-02-01"), "2025-02-01", "a"
+        )
+
+        loaded = self.store.load_forecasts(
+            "ALGOUSDT", "1h", start="2025-02-01 05:00", end="2025-02-01 10:00"
+        )
+
+        self.assertEqual(len(loaded), 6)
+        self.assertEqual(loaded["ds"].min(), pd.Timestamp("2025-02-01 05:00"))
+        self.assertEqual(loaded["ds"].max(), pd.Timestamp("2025-02-01 10:00"))
+
+        runs = self.store.load_runs("ALGOUSDT", "1h", start="2025-02-02")
+        self.assertTrue(runs.empty)
+
+    def test_symbols_are_partitioned(self):
+        """Test symbols are stored in separate partitions."""
+        self.store.append(
+            "ALGOUSDT", "1h", self.create_forecast_df("2025-02-01"), "2025-02-01", "a"
+        )
+
+        self.assertTrue(self.store.load_forecasts("BTCUSDT").empty)
+        self.assertFalse(self.store.load_forecasts("ALGOUSDT").empty)
+
+    def test_latest_forecast(self):
+        """Test the most recent run is returned."""
+        self.store.append(
+            "ALGOUSDT", "1h", self.create_forecast_df("2025-02-01"), "2025-02-01", "a"
+        )
+        latest_id = self.store.append(
+            "ALGOUSDT", "1h", self.create_forecast_df("2025-02-02"), "2025-02-02", "a"
+        )
+
+        latest = self.store.latest_forecast("ALGOUSDT", "1h")
+
+        self.assertTrue((latest["run_id"] == latest_id).all())
+        self.assertTrue(self.store.latest_forecast("ALGOUSDT", "1d").empty)
+
+    def test_fingerprints(self):
+        """Test fingerprints are stable and sensitive to changes."""
+        config = {"model": "NHITS", "h": 24, "levels": [80, 90]}
+        self.assertEqual(model_fingerprint(config), model_fingerprint(dict(config)))
+        self.assertNotEqual(
+            model_fingerprint(config), model_fingerprint({**config, "h": 12})
+        )
+
+        df = self.create_forecast_df("2025-02-01")
+        self.assertEqual(data_fingerprint(df), data_fingerprint(df.copy()))
+        changed = df.copy()
+        changed.loc[0, "NHITS"] = 1.0
+        self.assertNotEqual(data_fingerprint(df), data_fingerprint(changed))
+
+
+if __name__ == "__main__":
+    unittest.main()
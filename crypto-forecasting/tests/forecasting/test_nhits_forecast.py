@@ -0,0 +1,79 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import logging
+import pandas as pd
+import numpy as np
+from unittest.mock import MagicMock
+
+# the forecaster imports its siblings like main.py does, from within src
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from forecasting.nhits_forecast import NHitsForecaster
+from forecasting.forecast_store import ForecastStore, data_fingerprint
+
+
+class TestNHitsForecaster(unittest.TestCase):
+    def setUp(self):
+        """Set up a forecaster with a temporary store and a mocked model."""
+        self.temp_dir = tempfile.mkdtemp()
+        logging.disable(logging.CRITICAL)
+
+        self.forecaster = NHitsForecaster(symbol="ALGOUSDT", timeframe="1h")
+        self.forecaster.store = ForecastStore(self.temp_dir)
+        self.forecaster.model_fingerprint = "fp"
+        self.forecaster.y_df = pd.DataFrame(
+            {
+                "unique_id": "ALGOUSDT_1h",
+                "ds": pd.date_range("2025-02-01", periods=48, freq="h"),
+                "y": np.linspace(-0.01, 0.01, 48),
+            }
+        )
+
+        forecast_df = pd.DataFrame(
+            {
+                "unique_id": "ALGOUSDT_1h",
+                "ds": pd.date_range("2025-02-03", periods=24, freq="h"),
+                "NHITS-median": np.zeros(24),
+            }
+        )
+        self.forecaster.model = MagicMock()
+        self.forecaster.model.predict.return_value = forecast_df
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        logging.disable(logging.NOTSET)
+
+    def test_predict_uses_prepared_data(self):
+        """Test the prepared frame is forecast, not the dataset saved with the model."""
+        self.forecaster.predict()
+
+        self.forecaster.model.predict.assert_called_once()
+        self.assertIs(
+            self.forecaster.model.predict.call_args.kwargs["df"], self.forecaster.y_df
+        )
+
+        runs = self.forecaster.store.load_runs("ALGOUSDT")
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(
+            pd.Timestamp(runs["origin"].iloc[0]), pd.Timestamp("2025-02-02 23:00")
+        )
+        self.assertEqual(
+            runs["data_fingerprint"].iloc[0], data_fingerprint(self.forecaster.y_df)
+        )
+        self.assertIn("NHITS", self.forecaster.forecast_df.columns)
+
+    def test_predict_requires_data(self):
+        """Test predicting without prepared data fails instead of using stale data."""
+        self.forecaster.y_df = None
+
+        with self.assertRaises(ValueError):
+            self.forecaster.predict()
+        self.forecaster.model.predict.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -246,6 +246,57 @@ class TestResultPlotter(unittest.TestCase):
             # Close the figure to free memory
             plt.close(fig)
 
+    def add_quantile_columns(self, forecast_df, levels):
+        """Add symmetric lo/hi quantile returns around the median forecast."""
+        for level in levels:
+            spread = 0.0001 * level
+            forecast_df[f"NHITS-lo-{level}"] = forecast_df["NHITS"] - spread
+            forecast_df[f"NHITS-hi-{level}"] = forecast_df["NHITS"] + spread
+        return forecast_df
+
+    def test_get_forecast_levels(self):
+        """Test interval levels are detected from the quantile columns."""
+        self.assertEqual(self.plotter.get_forecast_levels(), [])
+
+        self.add_quantile_columns(self.forecast_df, [90, 80])
+
+        self.assertEqual(self.plotter.get_forecast_levels(), ["80", "90"])
+
+    def test_convert_returns_to_prices_with_quantiles(self):
+        """Test quantile returns are converted to ordered price bands."""
+        self.add_quantile_columns(self.forecast_df, [80, 90])
+
+        _, forecast_df = self.plotter.convert_returns_to_prices()
+
+        for level in ["80", "90"]:
+            lo = forecast_df[f"absolute_price-lo-{level}"]
+            hi = forecast_df[f"absolute_price-hi-{level}"]
+            self.assertTrue((lo < forecast_df["absolute_price"]).all())
+            self.assertTrue((hi > forecast_df["absolute_price"]).all())
+
+        # wider levels produce wider bands
+        self.assertTrue(
+            (
+                forecast_df["absolute_price-hi-90"]
+                >= forecast_df["absolute_price-hi-80"]
+            ).all()
+        )
+
+    @patch("matplotlib.pyplot.savefig")
+    def test_plot_absolute_prices_fan_chart(self, mock_savefig):
+        """Test a fan band is drawn for each interval level."""
+        self.add_quantile_columns(self.forecast_df, [80, 90])
+
+        fig = self.plotter.plot_absolute_prices(
+            timeframe_configs=self.timeframe_configs, timeframe="1h"
+        )
+
+        ax = fig.get_axes()[0]
+        self.assertEqual(len(ax.collections), 2)
+        legend_texts = [text.get_text() for text in ax.get_legend().get_texts()]
+        self.assertIn("80% interval", legend_texts)
+        self.assertIn("90% interval", legend_texts)
+
     def test_error_handling(self):
         """Test that appropriate errors are raised for invalid input."""
         # Test missing timeframe_configs
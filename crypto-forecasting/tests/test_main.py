@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.main import create_parser, fetch, train, predict, run
+from src.benchmark_startup import SUBCOMMAND_IMPORTS, measure, startup_code
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        """Set up the CLI parser."""
+        self.parser = create_parser()
+
+    def test_fetch_arguments(self):
+        """Test fetch defaults to all timeframes and supports live priority."""
+        args = self.parser.parse_args(["fetch", "--symbol", "BTCUSDT", "--live"])
+
+        self.assertIs(args.func, fetch)
+        self.assertEqual(args.symbol, "BTCUSDT")
+        self.assertIsNone(args.timeframe)
+        self.assertTrue(args.live)
+
+    def test_model_arguments(self):
+        """Test model options are parsed for training."""
+        args = self.parser.parse_args(
+            ["train", "--timeframe", "4h", "--compact", "--levels", "80", "90"]
+        )
+
+        self.assertIs(args.func, train)
+        self.assertEqual(args.timeframe, "4h")
+        self.assertTrue(args.compact)
+        self.assertEqual(args.levels, [80, 90])
+
+    def test_run_defaults(self):
+        """Test the complete pipeline keeps the previous defaults."""
+        args = self.parser.parse_args(["run"])
+
+        self.assertIs(args.func, run)
+        self.assertEqual(args.symbol, "ALGOUSDT")
+        self.assertEqual(args.timeframe, "1h")
+        self.assertFalse(args.compact)
+        self.assertIsNone(args.levels)
+
+    def test_predict_loads_model_before_data(self):
+        """Test the saved model settings are loaded before the data is prepared."""
+        args = self.parser.parse_args(["predict"])
+        forecaster = MagicMock()
+
+        with patch("src.main.create_forecaster", return_value=forecaster):
+            predict(args)
+
+        self.assertEqual(
+            [name for name, _, _ in forecaster.method_calls],
+            ["load_model", "prepare_data", "predict"],
+        )
+
+    def test_fetch_startup_is_lazy(self):
+        """Test the fetch subcommand does not import heavy dependencies."""
+        _, loaded_modules = measure(startup_code(SUBCOMMAND_IMPORTS["fetch"]), 1)
+
+        self.assertEqual(loaded_modules, "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
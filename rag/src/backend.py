@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from qdrant.db_manager import VectorDbManager
+from qdrant.llm_manager import LlmManager
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class RequestPool:
+    """
+    Limits the number of concurrent LLM requests. Further requests wait in
+    first come, first served order, and are rejected once too many wait, so
+    an overloaded backend answers quickly instead of timing out.
+    """
+
+    def __init__(self, max_concurrency=4, max_queue=64):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(f"{self.waiting} requests are already waiting")
+
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            yield
+            self.completed += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+            self.semaphore.release()
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+        }
+
+
+class RagService:
+    """
+    Async backend owning the Qdrant and LLM clients (and optionally LightRAG)
+    for all streamlit sessions. Answers are streamed as newline delimited json
+    events: "retrieval", "token", "done" and "error".
+    """
+
+    def __init__(
+        self,
+        collection_name="projects",
+        qdrant_location="http://localhost:6333",
+        max_concurrency=4,
+        max_queue=64,
+        retrieval_workers=8,
+        answer_cache_size=256,
+        lightrag=False,
+    ):
+        """
+        Args:
+            collection_name: Qdrant collection with the documents
+            qdrant_location: Qdrant url, or ":memory:" for the local mode
+            max_concurrency: Number of concurrent LLM requests
+            max_queue: Number of LLM requests waiting before new ones are
+            rejected
+            retrieval_workers: Threads for the blocking retrieval calls
+            answer_cache_size: Number of cached answers, 0 disables the cache
+            lightrag: Also serve the LightRAG system
+        """
+        self.collection_name = collection_name
+        self.qdrant_location = qdrant_location
+        self.answer_cache_size = answer_cache_size
+        self.use_lightrag = lightrag
+        self.pool = RequestPool(max_concurrency, max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=retrieval_workers)
+        self.sessions = {}
+        self.db_manager = None
+        self.llm_manager = None
+        self.rag = None
+
+    async def run_blocking(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def start(self, app):
+        self.db_manager = await self.run_blocking(
+            VectorDbManager, location=self.qdrant_location, hybrid=True
+        )
+        await self.run_blocking(self.db_manager.init_qdrant, self.collection_name)
+        self.llm_manager = LlmManager(cache_size=self.answer_cache_size)
+        if self.use_lightrag:
+            from lightRAG import start_rag
+
+            self.rag = await start_rag()
+
+    async def stop(self, app):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @contextlib.contextmanager
+    def session(self, session_id):
+        if session_id is None:
+            yield
+            return
+        # a new question of the same session cancels its unfinished answer
+        previous = self.sessions.get(session_id)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        task = asyncio.current_task()
+        self.sessions[session_id] = task
+        try:
+            yield
+        finally:
+            if self.sessions.get(session_id) is task:
+                del self.sessions[session_id]
+
+    async def send(self, response, event):
+        await response.write(json.dumps(event).encode("utf-8") + b"\n")
+
+    async def qdrant_query(self, request):
+        body = await request.json()
+        question = body["question"]
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+
+        with self.session(body.get("session_id")):
+            retrieval = await self.run_blocking(
+                self.db_manager.retrieve_top_source, question
+            )
+            query_vector = await self.run_blocking(
+                self.db_manager.embed_query, question
+            )
+            await response.prepare(request)
+            await self.send(
+                response,
+                {
+                    "type": "retrieval",
+                    "documents": [
+                        {**doc.metadata, "score": doc.score} for doc in retrieval
+                    ],
+                },
+            )
+
+            timings = {}
+            try:
+                async with self.pool.slot():
+                    async for piece in self.llm_manager.astream_response(
+                        user_input=question,
+                        retrieval=retrieval,
+                        query_vector=query_vector,
+                        index_version=self.db_manager.collection_version,
+                        timings=timings,
+                    ):
+                        await self.send(response, {"type": "token", "text": piece})
+            except QueueFullError as e:
+                await self.send(response, {"type": "error", "message": str(e)})
+            else:
+                await self.send(response, {"type": "done", "timings": timings})
+
+        await response.write_eof()
+        return response
+
+    async def lightrag_query(self, request):
+        from lightRAG import query_rag
+
+        if self.rag is None:
+            raise web.HTTPNotFound(text="LightRAG is not enabled")
+        body = await request.json()
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+
+        with self.session(body.get("session_id")):
+            await response.prepare(request)
+            try:
+                async with self.pool.slot():
+                    result = await query_rag(
+                        self.rag,
+                        body["question"],
+                        mode=body.get("mode") or os.environ.get("MODE", "hybrid"),
+                    )
+                    if isinstance(result, str):
+                        await self.send(response, {"type": "token", "text": result})
+                    else:
+                        async for piece in result:
+                            await self.send(response, {"type": "token", "text": piece})
+            except QueueFullError as e:
+                await self.send(response, {"type": "error", "message": str(e)})
+            else:
+                await self.send(response, {"type": "done", "timings": {}})
+
+        await response.write_eof()
+        return response
+
+    async def reload(self, request):
+        await self.run_blocking(self.db_manager.init_qdrant, self.collection_name)
+        return web.json_response({"version": self.db_manager.collection_version})
+
+    async def stats(self, request):
+        caches = {
+            **self.db_manager.cache_stats(),
+            "answers": self.llm_manager.answer_cache.stats(),
+        }
+        if self.rag is not None:
+            caches["lightrag embeddings"] = self.rag.embedding_cache.stats()
+            caches["lightrag llm"] = self.rag.completion_cache.stats()
+            caches["lightrag answers"] = self.rag.answer_cache.stats()
+        return web.json_response({"pool": self.pool.stats(), "caches": caches})
+
+    def create_app(self):
+        app = web.Application()
+        app.on_startup.append(self.start)
+        app.on_cleanup.append(self.stop)
+        app.router.add_post("/qdrant/query", self.qdrant_query)
+        app.router.add_post("/qdrant/reload", self.reload)
+        app.router.add_post("/lightrag/query", self.lightrag_query)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async backend of the RAG apps")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--collection_name", type=str, default="projects")
+    parser.add_argument("--qdrant_location", type=str, default="http://localhost:6333")
+    parser.add_argument("--max_concurrency", type=int, default=4)
+    parser.add_argument("--max_queue", type=int, default=64)
+    parser.add_argument("--answer_cache_size", type=int, default=256)
+    parser.add_argument("--lightrag", action="store_true")
+    args = parser.parse_args()
+
+    service = RagService(
+        collection_name=args.collection_name,
+        qdrant_location=args.qdrant_location,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        answer_cache_size=args.answer_cache_size,
+        lightrag=args.lightrag,
+    )
+    # cancel the handler, and with it the LLM request, if the client leaves
+    web.run_app(
+        service.create_app(),
+        host=args.host,
+        port=args.port,
+        handler_cancellation=True,
+    )
@@ -0,0 +1,34 @@
+import json
+import os
+
+import aiohttp
+
+# the apps answer through the backend service if its url is set
+BACKEND_URL = os.environ.get("RAG_BACKEND_URL")
+
+
+async def stream_events(path, payload, backend_url=None):
+    """Yield the json events the backend streams for a request"""
+    url = f"{(backend_url or BACKEND_URL).rstrip('/')}{path}"
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
+
+
+async def get_json(path, backend_url=None):
+    url = f"{(backend_url or BACKEND_URL).rstrip('/')}{path}"
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+async def post_json(path, payload=None, backend_url=None):
+    url = f"{(backend_url or BACKEND_URL).rstrip('/')}{path}"
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=payload or {}) as response:
+            response.raise_for_status()
+            return await response.json()
@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import aiohttp
+from aiohttp import web
+
+USERS = [1, 2, 5, 10, 20, 50]
+
+
+class FakeOllama:
+    """
+    Minimal stand-in for the ollama /api/chat endpoint. Like ollama with
+    OLLAMA_NUM_PARALLEL, only a few requests are processed at once, each one
+    prefills for a fixed time and then streams its tokens at a fixed rate.
+    """
+
+    def __init__(self, parallel=4, prefill=0.2, tokens=40, token_interval=0.02):
+        self.parallel = parallel
+        self.prefill = prefill
+        self.tokens = tokens
+        self.token_interval = token_interval
+        self.semaphore = None
+
+    def message(self, content, done, **stats):
+        return {
+            "model": "llama3.1:8b",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+            **stats,
+        }
+
+    async def chat(self, request):
+        body = await request.json()
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.parallel)
+
+        async with self.semaphore:
+            start = time.perf_counter()
+            await asyncio.sleep(self.prefill)
+            prompt_eval = time.perf_counter() - start
+            words = [f"token{i} " for i in range(self.tokens)]
+            stats = {
+                "done_reason": "stop",
+                "total_duration": 0,
+                "load_duration": 0,
+                "prompt_eval_count": sum(
+                    len(m.get("content", "")) // 4 for m in body["messages"]
+                ),
+                "prompt_eval_duration": int(prompt_eval * 1e9),
+                "eval_count": self.tokens,
+                "eval_duration": int(self.tokens * self.token_interval * 1e9),
+            }
+            if not body.get("stream", True):
+                await asyncio.sleep(self.tokens * self.token_interval)
+                return web.json_response(self.message("".join(words), True, **stats))
+
+            response = web.StreamResponse(
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+            await response.prepare(request)
+            for word in words:
+                await asyncio.sleep(self.token_interval)
+                await response.write(
+                    json.dumps(self.message(word, False)).encode() + b"\n"
+                )
+            await response.write(
+                json.dumps(self.message("", True, **stats)).encode() + b"\n"
+            )
+            await response.write_eof()
+            return response
+
+    async def start(self, port):
+        app = web.Application()
+        app.router.add_post("/api/chat", self.chat)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        return runner
+
+
+async def ask(session, backend_url, question, session_id):
+    start = time.perf_counter()
+    async with session.post(
+        f"{backend_url}/qdrant/query",
+        json={"question": question, "session_id": session_id},
+    ) as response:
+        async for line in response.content:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["type"] == "error":
+                return None
+    return time.perf_counter() - start
+
+
+async def run_users(backend_url, users, requests_per_user):
+    latencies = []
+    rejected = 0
+
+    async def user(user_id):
+        nonlocal rejected
+        async with aiohttp.ClientSession() as session:
+            for i in range(requests_per_user):
+                latency = await ask(
+                    session,
+                    backend_url,
+                    f"What is project {i} about? ({user_id})",
+                    f"user-{user_id}",
+                )
+                if latency is None:
+                    rejected += 1
+                else:
+                    latencies.append(latency)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(user_id) for user_id in range(users)))
+    duration = time.perf_counter() - start
+    return {
+        "throughput": len(latencies) / duration,
+        "p50": statistics.median(latencies) if latencies else float("nan"),
+        "p95": (
+            statistics.quantiles(latencies, n=20)[-1]
+            if len(latencies) > 1
+            else latencies[0] if latencies else float("nan")
+        ),
+        "rejected": rejected,
+    }
+
+
+async def wait_for_backend(backend_url, process, timeout=600):
+    start = time.monotonic()
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError("backend exited during startup")
+            try:
+                async with session.get(f"{backend_url}/stats") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(1)
+    raise TimeoutError("backend did not start")
+
+
+async def run_benchmark(args):
+    fake = FakeOllama(
+        parallel=args.ollama_parallel,
+        prefill=args.prefill,
+        tokens=args.tokens,
+        token_interval=args.token_interval,
+    )
+    runner = await fake.start(args.ollama_port)
+
+    backend_url = f"http://127.0.0.1:{args.backend_port}"
+    backend = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(os.path.dirname(__file__), "backend.py"),
+            "--port",
+            str(args.backend_port),
+            "--collection_name",
+            "backend-benchmark",
+            "--qdrant_location",
+            args.qdrant_location,
+            "--max_concurrency",
+            str(args.max_concurrency),
+            "--max_queue",
+            str(args.max_queue),
+            # every request has to reach the LLM
+            "--answer_cache_size",
+            "0",
+        ],
+        env={**os.environ, "OLLAMA_HOST": f"http://127.0.0.1:{args.ollama_port}"},
+    )
+    try:
+        await wait_for_backend(backend_url, backend)
+        print(
+            f"{'users':>6}{'requests':>10}{'req/s':>8}{'p50 (s)':>9}"
+            f"{'p95 (s)':>9}{'rejected':>10}"
+        )
+        for users in args.users:
+            stats = await run_users(backend_url, users, args.requests_per_user)
+            print(
+                f"{users:>6}{users * args.requests_per_user:>10}"
+                f"{stats['throughput']:>8.2f}{stats['p50']:>9.2f}"
+                f"{stats['p95']:>9.2f}{stats['rejected']:>10}"
+            )
+    finally:
+        backend.terminate()
+        backend.wait()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load test the RAG backend against a fake ollama server"
+    )
+    parser.add_argument("--users", type=int, nargs="+", default=USERS)
+    parser.add_argument("--requests_per_user", type=int, default=5)
+    parser.add_argument("--backend_port", type=int, default=8765)
+    parser.add_argument("--ollama_port", type=int, default=11535)
+    parser.add_argument("--qdrant_location", type=str, default=":memory:")
+    parser.add_argument("--max_concurrency", type=int, default=4)
+    parser.add_argument("--max_queue", type=int, default=64)
+    parser.add_argument("--ollama_parallel", type=int, default=4)
+    parser.add_argument("--prefill", type=float, default=0.2)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token_interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args))
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from document_processing import DocumentProcessor
+
+WORDS = (
+    "model data vector query retrieval embedding chunk forecast qdrant index "
+    "document section latency memory stream batch token context answer project"
+).split()
+
+
+def create_corpus(corpus_dir, size_mb, file_mb=1):
+    """Write a synthetic markdown corpus of roughly size_mb megabytes."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    rng = random.Random(42)
+    for i in range(max(1, size_mb // file_mb)):
+        file_path = os.path.join(corpus_dir, f"document-{i:05d}.md")
+        if os.path.exists(file_path):
+            continue
+        parts = [f"# Document {i}\n"]
+        size = 0
+        section = 0
+        while size < file_mb * 1024 * 1024:
+            paragraph = " ".join(rng.choice(WORDS) for _ in range(120))
+            if size // 4096 > section:
+                section = size // 4096
+                parts.append(f"\n## Section {section}\n")
+            parts.append(paragraph + "\n\n")
+            size += len(paragraph) + 2
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("".join(parts))
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode, corpus_dir):
+    processor = DocumentProcessor(corpus_dir)
+    start = time.perf_counter()
+    if mode == "stream":
+        chunks = sum(1 for _ in processor.iter_chunks())
+    else:
+        documents = processor.load_documents()
+        content, metadata = processor.split_metadata(
+            processor.chunk_documents(documents)
+        )
+        chunks = len(content)
+    return {
+        "mode": mode,
+        "chunks": chunks,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmark(corpus_dir, size_mb, modes):
+    print(f"Creating {size_mb} MB corpus in {corpus_dir}...")
+    create_corpus(corpus_dir, size_mb)
+
+    print(f"{'mode':<8}{'chunks':>10}{'seconds':>10}{'peak RSS (MB)':>16}")
+    for mode in modes:
+        # fresh interpreter per mode, so the peak RSS is not shared
+        result = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--corpus_dir", corpus_dir],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(
+            f"{stats['mode']:<8}{stats['chunks']:>10}{stats['seconds']:>10.1f}"
+            f"{stats['peak_rss_mb']:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare memory of streaming and list based document loading"
+    )
+    parser.add_argument(
+        "--corpus_dir",
+        type=str,
+        default=os.path.join(tempfile.gettempdir(), "rag-benchmark-corpus"),
+    )
+    parser.add_argument("--size_mb", type=int, default=1024)
+    parser.add_argument(
+        "--skip_legacy",
+        action="store_true",
+        help="Only run the streaming loader, the list based one needs several GB",
+    )
+    parser.add_argument("--mode", choices=["stream", "legacy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.corpus_dir)))
+    else:
+        modes = ["stream"] if args.skip_legacy else ["stream", "legacy"]
+        run_benchmark(args.corpus_dir, args.size_mb, modes)
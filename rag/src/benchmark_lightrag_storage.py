@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from lightrag import QueryParam
+from lightrag.kg import STORAGE_ENV_REQUIREMENTS
+
+from lightRAG import (
+    DEFAULT_STORAGES,
+    initialize_rag,
+    load_data,
+)
+
+# local alternatives to the default file based storages, the ones needing a
+# server are skipped unless its env vars (e.g. QDRANT_URL) are set
+COMBINATIONS = {
+    "json-nano-networkx": {},
+    "json-faiss-networkx": {"vector_storage": "FaissVectorDBStorage"},
+    "json-qdrant-networkx": {"vector_storage": "QdrantVectorDBStorage"},
+    "json-nano-neo4j": {"graph_storage": "Neo4JStorage"},
+    "pg-nano-networkx": {
+        "kv_storage": "PGKVStorage",
+        "doc_status_storage": "PGDocStatusStorage",
+    },
+    "pg-pgvector-networkx": {
+        "kv_storage": "PGKVStorage",
+        "vector_storage": "PGVectorStorage",
+        "doc_status_storage": "PGDocStatusStorage",
+    },
+}
+
+QUESTIONS = [
+    "What is the goal of the crypto forecasting project?",
+    "Which models are used for the forecasts?",
+    "How are the documents indexed in the RAG systems?",
+    "Which technologies are used in the projects?",
+    "What are the results and next steps?",
+]
+
+MODES = ["naive", "local", "global", "hybrid"]
+
+
+def storages_of(combination):
+    return {**DEFAULT_STORAGES, **COMBINATIONS[combination]}
+
+
+def missing_env_vars(storages):
+    required = [
+        var
+        for storage in storages.values()
+        for var in STORAGE_ENV_REQUIREMENTS.get(storage, [])
+    ]
+    return [var for var in dict.fromkeys(required) if var not in os.environ]
+
+
+def peak_rss_mb():
+    # kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def ingest(storages):
+    start = time.perf_counter()
+    rag = await initialize_rag(storages)
+    await load_data(rag)
+    await rag.finalize_storages()
+    return {"ingest": time.perf_counter() - start}
+
+
+async def measure(storages):
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    rag = await initialize_rag(storages)
+    load = time.perf_counter() - start
+    rss_loaded = peak_rss_mb()
+
+    latencies = {}
+    for mode in MODES:
+        durations = []
+        for question in QUESTIONS:
+            # the given keywords skip the llm, only the retrieval is measured
+            param = QueryParam(
+                mode=mode,
+                only_need_context=True,
+                hl_keywords=[question],
+                ll_keywords=[question],
+            )
+            query_start = time.perf_counter()
+            await rag.aquery(question, param=param)
+            durations.append(time.perf_counter() - query_start)
+        latencies[mode] = statistics.median(durations)
+    await rag.finalize_storages()
+
+    return {
+        "load": load,
+        "latencies": latencies,
+        "rss_loaded": rss_loaded - rss_before,
+        "rss_peak": peak_rss_mb(),
+    }
+
+
+def run_phase(combination, phase):
+    # a fresh process per measurement, nothing is loaded or cached before
+    result = subprocess.run(
+        [sys.executable, __file__, "--combination", combination, "--phase", phase],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(combinations):
+    print(
+        f"{'storages':<22}{'ingest (s)':>11}{'load (s)':>10}"
+        + "".join(f"{mode + ' (ms)':>13}" for mode in MODES)
+        + f"{'loaded RSS (MB)':>17}{'peak RSS (MB)':>15}"
+    )
+    for combination in combinations:
+        missing = missing_env_vars(storages_of(combination))
+        if missing:
+            print(f"{combination:<22}skipped, set {', '.join(missing)}")
+            continue
+        try:
+            ingested = run_phase(combination, "ingest")
+            measured = run_phase(combination, "measure")
+        except RuntimeError as e:
+            print(f"{combination:<22}failed: {e}")
+            continue
+        print(
+            f"{combination:<22}{ingested['ingest']:>11.1f}{measured['load']:>10.2f}"
+            + "".join(f"{measured['latencies'][mode] * 1000:>13.1f}" for mode in MODES)
+            + f"{measured['rss_loaded']:>17.0f}{measured['rss_peak']:>15.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare load time, query latency and memory of LightRAG storages"
+    )
+    parser.add_argument(
+        "--combinations", type=str, nargs="+", default=list(COMBINATIONS)
+    )
+    parser.add_argument("--combination", type=str, choices=list(COMBINATIONS))
+    parser.add_argument("--phase", type=str, choices=["ingest", "measure"])
+    args = parser.parse_args()
+
+    if args.combination:
+        phase = ingest if args.phase == "ingest" else measure
+        result = asyncio.run(phase(storages_of(args.combination)))
+        print(json.dumps(result))
+    else:
+        run_benchmark(args.combinations)
@@ -0,0 +1,99 @@
+import argparse
+import statistics
+from types import SimpleNamespace
+
+from langchain.chat_models import init_chat_model
+
+from document_processing import DocumentProcessor
+from qdrant.llm_manager import LlmManager
+
+QUESTIONS = [
+    "What is the goal of this project?",
+    "Which technologies are used?",
+    "What are the results and next steps?",
+]
+
+
+def legacy_prompt(user_input, context):
+    # layout before the static instruction prefix, query ahead of the context
+    return f"""You are a helpful assistant that answers the following
+        user query based on the given context.Generate a response that is
+        precisely based on the given context. Do not add any information.
+        If the user query cannot be answered based on the given context,
+        answer with 'I am sorry, I don't know'.
+
+        Here is the user query you should answer:
+            {user_input}
+
+
+        Here is the given context:
+            {context}
+
+
+        Reflect if your response would contain all informations of the context.
+        It is important to preserve all given informations in your response.
+
+        """
+
+
+def create_requests(llm_manager, document_dir):
+    """One (question, context) pair per question and document."""
+    processor = DocumentProcessor(document_dir)
+    requests = []
+    for file_path in processor.list_files():
+        retrieval = [
+            SimpleNamespace(score=-i, metadata={**metadata, "document": text})
+            for i, (text, metadata) in enumerate(processor.iter_file_chunks(file_path))
+        ]
+        context = llm_manager.create_context_from_retrieval(retrieval)
+        requests.extend((question, context) for question in QUESTIONS)
+    return requests
+
+
+def run_layout(model, layout, requests):
+    prefill, evaluated = [], []
+    for question, context in requests:
+        response = model.invoke(layout(question, context))
+        metadata = response.response_metadata
+        prefill.append(metadata["prompt_eval_duration"] / 1e9)
+        evaluated.append(metadata["prompt_eval_count"])
+    return prefill, evaluated
+
+
+def run_benchmark(document_dir, num_predict):
+    llm_manager = LlmManager()
+    # only the prefill is of interest, keep the generation short
+    model = init_chat_model(
+        "llama3.1:8b",
+        model_provider="ollama",
+        temperature=0.3,
+        keep_alive="30m",
+        num_predict=num_predict,
+    )
+    requests = create_requests(llm_manager, document_dir)
+    # load the model before measuring
+    model.invoke("Hello")
+
+    layouts = {"legacy": legacy_prompt, "prefix": llm_manager.generate_prompt}
+    print(f"{'layout':<8}{'requests':>10}{'prefill tokens':>16}{'prefill (s)':>13}")
+    results = {}
+    for name, layout in layouts.items():
+        prefill, evaluated = run_layout(model, layout, requests)
+        results[name] = statistics.mean(prefill)
+        print(
+            f"{name:<8}{len(requests):>10}{statistics.mean(evaluated):>16.0f}"
+            f"{results[name]:>13.2f}"
+        )
+    saved = results["legacy"] - results["prefix"]
+    print(f"prefill saved per query: {saved:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the prefill time of the prompt layouts on ollama"
+    )
+    parser.add_argument("--document_dir", type=str, default="resources/documents")
+    parser.add_argument("--num_predict", type=int, default=16)
+    args = parser.parse_args()
+
+    run_benchmark(args.document_dir, args.num_predict)
@@ -0,0 +1,162 @@
+import argparse
+import re
+import time
+
+import httpx
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from qdrant.storage import StorageOptions
+
+COLLECTION = "storage-benchmark"
+
+CONFIGS = {
+    "float32": StorageOptions(),
+    "scalar": StorageOptions(quantization="scalar"),
+    "binary": StorageOptions(quantization="binary", oversampling=3.0),
+    "scalar-on-disk": StorageOptions(
+        quantization="scalar", on_disk=True, on_disk_payload=True
+    ),
+    "binary-on-disk": StorageOptions(
+        quantization="binary", on_disk=True, on_disk_payload=True, oversampling=3.0
+    ),
+    "hnsw-m8": StorageOptions(hnsw_m=8, hnsw_ef_construct=64),
+    "hnsw-m32": StorageOptions(hnsw_m=32, hnsw_ef_construct=256),
+}
+
+
+def create_vectors(n, dim, clusters=256, seed=42):
+    """Normalized vectors around random centers, similar to text embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)]
+    vectors += 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_neighbours(vectors, queries, k):
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def resident_memory_mb(location):
+    # prometheus metrics of the qdrant server, not available in the local mode
+    if not location.startswith("http"):
+        return None
+    metrics = httpx.get(f"{location.rstrip('/')}/metrics").text
+    match = re.search(r"^memory_resident_bytes (\S+)$", metrics, re.MULTILINE)
+    return float(match.group(1)) / 1024**2 if match else None
+
+
+def vector_ram_mb(options, n, dim):
+    """Estimated RAM of the vectors alone, the graph and payloads excluded."""
+    quantized = {None: 0, "scalar": dim, "binary": dim / 8}[options.quantization]
+    original = 0 if options.on_disk else dim * 4
+    return n * (quantized + original) / 1024**2
+
+
+def wait_for_index(client, timeout=600):
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        if client.get_collection(COLLECTION).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1)
+
+
+def run_config(client, location, options, vectors, queries, truth, k):
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    memory_before = resident_memory_mb(location)
+
+    client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=options.vectors_config(client),
+        on_disk_payload=options.on_disk_payload,
+    )
+    vector_name = client.get_vector_field_name()
+    client.upload_points(
+        collection_name=COLLECTION,
+        points=(
+            models.PointStruct(
+                id=i, vector={vector_name: vector.tolist()}, payload={"n": i}
+            )
+            for i, vector in enumerate(vectors)
+        ),
+        batch_size=512,
+    )
+    wait_for_index(client)
+
+    latencies = []
+    recall = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        points = client.query_points(
+            collection_name=COLLECTION,
+            query=query.tolist(),
+            using=vector_name,
+            search_params=options.search_params(),
+            limit=k,
+        ).points
+        latencies.append(time.perf_counter() - start)
+        recall += len({point.id for point in points} & set(expected.tolist())) / k
+
+    memory_after = resident_memory_mb(location)
+    client.delete_collection(COLLECTION)
+    return {
+        "recall": recall / len(queries),
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p99_ms": np.percentile(latencies, 99) * 1000,
+        "vector_ram_mb": vector_ram_mb(options, len(vectors), vectors.shape[1]),
+        "server_ram_mb": (
+            memory_after - memory_before
+            if memory_before is not None and memory_after is not None
+            else None
+        ),
+    }
+
+
+def run_benchmark(location, n_points, n_queries, k, configs):
+    client = QdrantClient(location=location)
+    dim = client.get_fastembed_vector_params()[client.get_vector_field_name()].size
+    print(f"Creating {n_points} vectors with {dim} dimensions...")
+    vectors = create_vectors(n_points + n_queries, dim)
+    vectors, queries = vectors[:n_points], vectors[n_points:]
+    truth = exact_neighbours(vectors, queries, k)
+
+    print(
+        f"{'config':<16}{f'recall@{k}':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}"
+        f"{'vector RAM (MB)':>17}{'server RAM (MB)':>17}"
+    )
+    for name in configs:
+        stats = run_config(client, location, CONFIGS[name], vectors, queries, truth, k)
+        server_ram = (
+            f"{stats['server_ram_mb']:.1f}"
+            if stats["server_ram_mb"] is not None
+            else "n/a"
+        )
+        print(
+            f"{name:<16}{stats['recall']:>10.3f}{stats['p50_ms']:>10.2f}"
+            f"{stats['p99_ms']:>10.2f}{stats['vector_ram_mb']:>17.1f}"
+            f"{server_ram:>17}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare recall, latency and RAM of vector storage options"
+    )
+    parser.add_argument(
+        "--location",
+        type=str,
+        default="http://localhost:6333",
+        help='Qdrant url, ":memory:" only checks the setup as it ignores the options',
+    )
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=7)
+    parser.add_argument(
+        "--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS)
+    )
+    args = parser.parse_args()
+
+    run_benchmark(args.location, args.points, args.queries, args.k, args.configs)
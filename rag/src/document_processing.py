@@ -1,23 +1,156 @@
+import os
+import re
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+HEADER_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+class MarkdownChunker:
+    """
+    Splits markdown along its heading hierarchy. Adjacent sections are packed
+    into one chunk as long as they fit the size limit, so chunks never end in
+    the middle of a section. Only sections larger than the limit are split
+    further, and only those splits overlap.
+    """
+
+    def __init__(self, chunk_size=2048, chunk_overlap=256):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.section_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+
+    def settings(self):
+        return {
+            "chunker": "markdown",
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+        }
+
+    def split_sections(self, text):
+        """Return (header path, section text) pairs in document order."""
+        sections = []
+        path = []
+        lines = []
+        in_code_block = False
+
+        for line in text.splitlines(keepends=True):
+            if line.lstrip().startswith("```"):
+                in_code_block = not in_code_block
+            match = None if in_code_block else HEADER_PATTERN.match(line)
+            if match:
+                if "".join(lines).strip():
+                    sections.append((list(path), "".join(lines).strip()))
+                level = len(match.group(1))
+                # drop headers of the same or a deeper level
+                path = [(lvl, title) for lvl, title in path if lvl < level]
+                path.append((level, match.group(2)))
+                lines = []
+            lines.append(line)
+
+        if "".join(lines).strip():
+            sections.append((list(path), "".join(lines).strip()))
+        return [([title for _, title in path], body) for path, body in sections]
+
+    def split_text(self, text):
+        """Return (chunk text, section path) pairs."""
+        chunks = []
+        packed, packed_paths = [], []
+
+        def flush():
+            if packed:
+                chunks.append(("\n\n".join(packed), common_path(packed_paths)))
+                packed.clear()
+                packed_paths.clear()
+
+        for path, body in self.split_sections(text):
+            if len(body) > self.chunk_size:
+                # small preceding sections (e.g. a bare title) lead the split
+                # instead of ending up as a tiny chunk of their own
+                body = "\n\n".join(packed + [body])
+                path = common_path(packed_paths + [path])
+                packed.clear()
+                packed_paths.clear()
+                for part in self.section_splitter.split_text(body):
+                    chunks.append((part, path))
+                continue
+            if sum(len(part) + 2 for part in packed) + len(body) > self.chunk_size:
+                # a bare heading belongs to the sections after it
+                carry = []
+                while len(packed) > 1 and "\n" not in packed[-1]:
+                    carry.insert(0, (packed.pop(), packed_paths.pop()))
+                flush()
+                for part, part_path in carry:
+                    packed.append(part)
+                    packed_paths.append(part_path)
+            packed.append(body)
+            packed_paths.append(path)
+        flush()
+
+        return [(chunk, " > ".join(path)) for chunk, path in chunks]
+
+
+def common_path(paths):
+    prefix = paths[0]
+    for path in paths[1:]:
+        length = 0
+        while length < min(len(prefix), len(path)) and prefix[length] == path[length]:
+            length += 1
+        prefix = prefix[:length]
+    return prefix
+
 
 class DocumentProcessor:
 
     def __init__(self, document_dir):
         self.dir = document_dir
+        # using the markdown heading hierarchy as separator
+        self.chunker = MarkdownChunker(chunk_size=2048, chunk_overlap=256)
 
     def load_documents(self):
         # preseve markdown for later chunking by using textloader
         loader = DirectoryLoader(self.dir, loader_cls=TextLoader)
         return loader.load()
 
+    def list_files(self):
+        files = []
+        for root, dirs, file_names in os.walk(self.dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for file_name in sorted(file_names):
+                if not file_name.startswith("."):
+                    files.append(os.path.join(root, file_name))
+        return files
+
+    def load_file(self, file_path):
+        return TextLoader(file_path).load()
+
+    def iter_documents(self, files=None):
+        """Yield the documents one file at a time instead of loading all."""
+        for file_path in files if files is not None else self.list_files():
+            yield from self.load_file(file_path)
+
+    def iter_file_chunks(self, file_path):
+        """Yield (content, metadata) pairs for the chunks of a single file."""
+        for document in self.load_file(file_path):
+            for text, section in self.chunker.split_text(document.page_content):
+                yield text, {**document.metadata, "section": section}
+
+    def iter_chunks(self, files=None):
+        """
+        Yield (content, metadata) pairs file by file. Only one file and its
+        chunks are held in memory, independent of the corpus size.
+        """
+        for file_path in files if files is not None else self.list_files():
+            yield from self.iter_file_chunks(file_path)
+
     def chunk_documents(self, documents):
-        # using level 2 headlines as separator
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2048, chunk_overlap=256
-        )
-        return text_splitter.split_documents(documents)
+        return [
+            Document(page_content=text, metadata={**doc.metadata, "section": section})
+            for doc in documents
+            for text, section in self.chunker.split_text(doc.page_content)
+        ]
 
     def split_metadata(self, chunks):
         metadata = []
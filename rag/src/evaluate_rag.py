@@ -0,0 +1,261 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+from lightrag import QueryParam
+
+from lightRAG import initialize_rag, load_data
+from qdrant.context_packing import TokenCounter
+from qdrant.db_manager import VectorDbManager
+from qdrant.llm_manager import LlmManager
+
+QUESTIONS_FILE = "resources/evaluation/questions.json"
+OUTPUT_DIR = "resources/evaluation"
+
+# Qdrant with dense vectors only, or fused with bm25 like the app
+QDRANT_STACKS = {"qdrant-dense": False, "qdrant-hybrid": True}
+LIGHTRAG_STACKS = {
+    f"lightrag-{mode}": mode for mode in ["naive", "local", "global", "hybrid"]
+}
+STACKS = [*QDRANT_STACKS, *LIGHTRAG_STACKS]
+
+# refusals of the Qdrant prompt and LightRAG's fail_response
+DONT_KNOW = ("don't know", "not able to provide an answer", "[no-context]")
+
+
+def load_questions(path):
+    """Questions with the file they are answered in and keywords of the answer"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def keyword_recall(answer, keywords):
+    answer = answer.lower()
+    return sum(keyword.lower() in answer for keyword in keywords) / len(keywords)
+
+
+def is_dont_know(answer):
+    answer = answer.lower()
+    return any(phrase.lower() in answer for phrase in DONT_KNOW)
+
+
+def score_answer(result, question, answer):
+    result["answer"] = answer
+    result["keyword_recall"] = keyword_recall(answer, question["keywords"])
+    result["dont_know"] = is_dont_know(answer)
+
+
+async def evaluate_qdrant(stack, location, questions, k, generate):
+    db_manager = VectorDbManager(location=location, hybrid=QDRANT_STACKS[stack])
+    # own collection, the manifest of the app's collection stays untouched
+    db_manager.init_qdrant(f"evaluation-{stack}")
+    llm_manager = LlmManager()
+
+    results = []
+    for question in questions:
+        # the answer path of the app, timed before the query embedding is cached
+        start = time.perf_counter()
+        retrieval = db_manager.retrieve_top_source(question["question"], group_size=k)
+        retrieved = time.perf_counter() - start
+
+        hits = db_manager.retrieve_information(question["question"], limit=k)
+        sources = {os.path.basename(hit.metadata["source"]) for hit in hits}
+        _, stats = llm_manager.context_packer.pack(retrieval)
+        result = {
+            "stack": stack,
+            "question": question["question"],
+            "recall": question["source"] in sources,
+            "context_tokens": stats["tokens"],
+            "retrieval": retrieved,
+        }
+
+        if generate:
+            timings = {}
+            answer = ""
+            # without query vector the answer cache is skipped
+            async for piece in llm_manager.astream_response(
+                question["question"], retrieval, timings=timings
+            ):
+                answer += piece
+            first_token = timings.get("time_to_first_token", timings["total"])
+            result["time_to_first_token"] = retrieved + first_token
+            result["total"] = retrieved + timings["total"]
+            score_answer(result, question, answer)
+        results.append(result)
+    return results
+
+
+async def stream_lightrag_answer(rag, question, param):
+    """Return the answer, the seconds until its first chunk and until the end"""
+    start = time.perf_counter()
+    response = await rag.aquery(question, param=param)
+    if isinstance(response, str):
+        duration = time.perf_counter() - start
+        return response, duration, duration
+
+    answer = ""
+    first_token = None
+    async for chunk in response:
+        if chunk and first_token is None:
+            first_token = time.perf_counter() - start
+        answer += chunk
+    total = time.perf_counter() - start
+    return answer, first_token if first_token is not None else total, total
+
+
+async def evaluate_lightrag(stacks, questions, k, generate):
+    rag = await initialize_rag()
+    await load_data(rag)
+    await rag.finalize_storages()
+
+    counter = TokenCounter()
+    results = []
+    # without llm caches every query extracts its keywords like a new
+    # question, the graph and the embeddings are reused
+    rag = await initialize_rag(llm_cache_path=None, enable_llm_cache=False)
+    try:
+        for stack in stacks:
+            mode = LIGHTRAG_STACKS[stack]
+            for question in questions:
+                # top_k counts entities and relations, in naive mode chunks
+                param = QueryParam(mode=mode, top_k=k, only_need_context=True)
+                start = time.perf_counter()
+                # None if no entities or relations were found
+                context = await rag.aquery(question["question"], param=param) or ""
+                retrieved = time.perf_counter() - start
+                result = {
+                    "stack": stack,
+                    "question": question["question"],
+                    # the context lists the file path of every entity,
+                    # relation and chunk
+                    "recall": question["source"] in context,
+                    "context_tokens": counter.count(context),
+                    "retrieval": retrieved,
+                }
+
+                if generate:
+                    param = QueryParam(mode=mode, top_k=k, stream=True)
+                    answer, first_token, total = await stream_lightrag_answer(
+                        rag, question["question"], param
+                    )
+                    result["time_to_first_token"] = first_token
+                    result["total"] = total
+                    score_answer(result, question, answer)
+                results.append(result)
+    finally:
+        await rag.finalize_storages()
+    return results
+
+
+def summarize(results, stacks):
+    summary = {}
+    for stack in stacks:
+        rows = [result for result in results if result["stack"] == stack]
+        if not rows:
+            continue
+
+        def values(name):
+            return [row[name] for row in rows if name in row]
+
+        summary[stack] = {
+            "questions": len(rows),
+            "recall": np.mean(values("recall")),
+            "context_tokens": np.mean(values("context_tokens")),
+            "retrieval_p50": np.percentile(values("retrieval"), 50),
+        }
+        if values("total"):
+            summary[stack].update(
+                {
+                    "time_to_first_token_p50": np.percentile(
+                        values("time_to_first_token"), 50
+                    ),
+                    "time_to_first_token_p95": np.percentile(
+                        values("time_to_first_token"), 95
+                    ),
+                    "total_p50": np.percentile(values("total"), 50),
+                    "total_p95": np.percentile(values("total"), 95),
+                    "keyword_recall": np.mean(values("keyword_recall")),
+                    "dont_know": np.mean(values("dont_know")),
+                }
+            )
+    return summary
+
+
+def format_report(summary, k):
+    columns = [
+        (f"recall@{k}", "recall", "{:.0%}"),
+        ("context tokens", "context_tokens", "{:.0f}"),
+        ("retrieval p50 (s)", "retrieval_p50", "{:.2f}"),
+        ("TTFT p50 (s)", "time_to_first_token_p50", "{:.2f}"),
+        ("TTFT p95 (s)", "time_to_first_token_p95", "{:.2f}"),
+        ("total p50 (s)", "total_p50", "{:.2f}"),
+        ("total p95 (s)", "total_p95", "{:.2f}"),
+        ("answer keywords", "keyword_recall", "{:.0%}"),
+        ("don't know", "dont_know", "{:.0%}"),
+    ]
+    lines = [
+        "# RAG Evaluation",
+        "",
+        "| stack | " + " | ".join(title for title, _, _ in columns) + " |",
+        "|---|" + "---:|" * len(columns),
+    ]
+    for stack, stats in summary.items():
+        cells = [
+            template.format(stats[name]) if name in stats else "-"
+            for _, name, template in columns
+        ]
+        lines.append(f"| {stack} | " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+async def run_evaluation(args):
+    questions = load_questions(args.questions)
+    generate = not args.retrieval_only
+
+    results = []
+    for stack in args.stacks:
+        if stack in QDRANT_STACKS:
+            print(f"Evaluating {stack}")
+            results.extend(
+                await evaluate_qdrant(stack, args.location, questions, args.k, generate)
+            )
+    lightrag_stacks = [stack for stack in args.stacks if stack in LIGHTRAG_STACKS]
+    if lightrag_stacks:
+        print(f"Evaluating {', '.join(lightrag_stacks)}")
+        results.extend(
+            await evaluate_lightrag(lightrag_stacks, questions, args.k, generate)
+        )
+
+    summary = summarize(results, args.stacks)
+    report = format_report(summary, args.k)
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, "report.md"), "w", encoding="utf-8") as f:
+        f.write(report)
+    with open(
+        os.path.join(args.output_dir, "results.json"), "w", encoding="utf-8"
+    ) as f:
+        json.dump(results, f, indent=2)
+    print(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare retrieval quality and latency of the RAG stacks"
+    )
+    parser.add_argument("--questions", type=str, default=QUESTIONS_FILE)
+    parser.add_argument("--output_dir", type=str, default=OUTPUT_DIR)
+    parser.add_argument("--stacks", type=str, nargs="+", choices=STACKS, default=STACKS)
+    # local mode, no qdrant server needed
+    parser.add_argument("--location", type=str, default=":memory:")
+    parser.add_argument("--k", type=int, default=7)
+    parser.add_argument(
+        "--retrieval_only",
+        action="store_true",
+        help="Only measure the retrieval, no answers are generated",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run_evaluation(args))
@@ -1,24 +1,51 @@
 import asyncio
+import functools
 import inspect
 import nest_asyncio
 
 nest_asyncio.apply()
 import os
 import logging
+import time
+import uuid
 import streamlit as st
 from dotenv import load_dotenv
 
 from lightrag import LightRAG, QueryParam
-from lightrag.llm.ollama import ollama_model_complete, ollama_embed
+from lightrag.llm.ollama import ollama_model_complete
 from lightrag.utils import EmbeddingFunc
 from lightrag.kg.shared_storage import initialize_pipeline_status
 
+# installed by lightrag.llm.ollama
+import ollama
+
 from pydantic_ai.messages import ModelRequest, ModelResponse
 
+from backend_client import BACKEND_URL, stream_events
+from qdrant.query_cache import QueryCache, normalize_query
+from lightrag_embedding import CachedEmbedding
+from lightrag_ingestion import LightRagIngestion
+from lightrag_llm import CachedCompletion
+from lightrag_runtime import LightRagRuntime
+
 load_dotenv()
 
 WORKING_DIR = "resources/data"
 DOCUMENT_DIR = "resources/documents"
+CHECKPOINT_FILE = "ingestion_checkpoint.json"
+# shared by all storages and kept when a graph is deleted to be built again,
+# the embeddings and llm responses only depend on the text and model
+CACHE_DIR = "resources/cache"
+EMBEDDING_CACHE_PATH = os.path.join(CACHE_DIR, "embeddings.sqlite")
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_responses.sqlite")
+
+# LightRAG's file based storages, loaded completely into memory
+DEFAULT_STORAGES = {
+    "kv_storage": "JsonKVStorage",
+    "vector_storage": "NanoVectorDBStorage",
+    "graph_storage": "NetworkXStorage",
+    "doc_status_storage": "JsonDocStatusStorage",
+}
 
 logging.basicConfig(format="%(levelname)s:%(message)s", level=logging.INFO)
 
@@ -26,12 +53,69 @@ if not os.path.exists(WORKING_DIR):
     os.mkdir(WORKING_DIR)
 
 
-async def initialize_rag():
+def storage_config():
+    """
+    Storage implementations selected by the KV_STORAGE, VECTOR_STORAGE,
+    GRAPH_STORAGE and DOC_STATUS_STORAGE env vars, e.g. FaissVectorDBStorage
+    or QdrantVectorDBStorage for the vectors and PGKVStorage for the kv data
+    """
+    return {
+        name: os.environ.get(name.upper(), default)
+        for name, default in DEFAULT_STORAGES.items()
+    }
+
+
+def storage_working_dir(storages):
+    # other storages start empty, they get their own working directory and
+    # ingestion checkpoint, so their documents are inserted again
+    if storages == DEFAULT_STORAGES:
+        return WORKING_DIR
+    names = [storages[name].removesuffix("Storage") for name in DEFAULT_STORAGES]
+    return f"{WORKING_DIR}-{'-'.join(names).lower()}"
+
+
+async def embed_with_ollama(client, texts):
+    # the async client, the ollama_embed of LightRAG blocks the event loop
+    response = await client.embed(
+        model=str(os.environ.get("EMBEDDING_MODEL")), input=texts
+    )
+    return response["embeddings"]
+
+
+async def initialize_rag(storages=None, llm_cache_path=LLM_CACHE_PATH, **options):
+    """
+    Args:
+        storages: Storage implementations, defaults to storage_config()
+        llm_cache_path: Sqlite file of the CachedCompletion cache, None
+        disables it
+        options: Further LightRAG arguments, e.g. enable_llm_cache=False
+    """
+    storages = storages or storage_config()
+    # one client per instance, its connections are reused by all batches and
+    # stay on the event loop of the instance
+    client = ollama.AsyncClient(host=str(os.environ.get("OLLAMA_URL")))
+    embedding = CachedEmbedding(
+        functools.partial(embed_with_ollama, client),
+        model_name=str(os.environ.get("EMBEDDING_MODEL")),
+        cache_path=EMBEDDING_CACHE_PATH,
+        max_batch_tokens=int(os.environ.get("EMBEDDING_MODEL_MAX_TOKENS")),
+    )
+    max_async = int(os.environ.get("MAX_ASYNC", 8))
+    completion = CachedCompletion(
+        ollama_model_complete,
+        model_name=str(os.environ.get("RAG_MODEL")),
+        cache_path=llm_cache_path,
+        max_async=max_async,
+    )
     rag = LightRAG(
-        working_dir=WORKING_DIR,
-        llm_model_func=ollama_model_complete,
+        working_dir=storage_working_dir(storages),
+        **storages,
+        llm_model_func=completion,
         llm_model_name=str(os.environ.get("RAG_MODEL")),
-        llm_model_max_async=4,
+        # upper bound, the concurrency is tuned by CachedCompletion
+        llm_model_max_async=max_async,
+        # replaced by the cache of CachedCompletion, kept across graph rebuilds
+        enable_llm_cache_for_entity_extract=False,
         llm_model_max_token_size=int(os.environ.get("RAG_MODEL_MAX_TOKENS")),
         llm_model_kwargs={
             "host": str(os.environ.get("OLLAMA_URL")),
@@ -40,13 +124,16 @@ async def initialize_rag():
         embedding_func=EmbeddingFunc(
             embedding_dim=int(os.environ.get("EMBEDDING_DIM")),
             max_token_size=int(os.environ.get("EMBEDDING_MODEL_MAX_TOKENS")),
-            func=lambda texts: ollama_embed(
-                texts,
-                embed_model=str(os.environ.get("EMBEDDING_MODEL")),
-                host=str(os.environ.get("OLLAMA_URL")),
-            ),
+            func=embedding,
         ),
+        **options,
     )
+    # keeps the cache statistics reachable, LightRAG wraps the functions
+    rag.embedding_cache = embedding
+    rag.completion_cache = completion
+    # answers per query mode and question, lives as long as the instance,
+    # which is shared by all sessions and reruns
+    rag.answer_cache = QueryCache(max_size=256)
 
     await rag.initialize_storages()
     await initialize_pipeline_status()
@@ -70,22 +157,106 @@ def display_message_part(part):
             st.markdown(part.content)
 
 
-def load_data(rag):
-    for file_name in os.listdir(DOCUMENT_DIR):
-        file_path = os.path.join(DOCUMENT_DIR, file_name)
-        if os.path.isfile(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                rag.insert(f.read())
-            print(f"Inserted document {file_name}")
+async def load_data(rag):
+    # only new or changed documents are sent, an interrupted run resumes
+    ingestion = LightRagIngestion(
+        rag, DOCUMENT_DIR, os.path.join(rag.working_dir, CHECKPOINT_FILE)
+    )
+    inserted = await ingestion.run()
+    for file_name in inserted:
+        print(f"Inserted document {file_name}")
+    if inserted:
+        # the answers were based on the previous graph
+        rag.answer_cache.clear()
+    stats = rag.embedding_cache.stats()
+    logging.info(
+        f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%}), {stats['requests']} requests to ollama"
+    )
+    stats = rag.completion_cache.stats()
+    logging.info(
+        f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%}), concurrency {stats['concurrency']}"
+    )
+
+
+async def start_rag():
+    """Initialize the storages, insert new documents and warm up the models"""
+    start = time.perf_counter()
+    rag = await initialize_rag()
+    initialized = time.perf_counter()
+    await load_data(rag)
+    loaded = time.perf_counter()
+    try:
+        # loads the embedding model into ollama before the first question
+        await rag.embedding_func(["warm up"])
+    except Exception as e:
+        logging.warning(f"Failed to warm up the embedding model: {e}")
+    warmed_up = time.perf_counter()
+    logging.info(
+        f"LightRAG started in {warmed_up - start:.2f}s (storages and graph "
+        f"{initialized - start:.2f}s, documents {loaded - initialized:.2f}s, "
+        f"warm up {warmed_up - loaded:.2f}s)"
+    )
+    return rag
+
+
+# one instance per server process, shared by all reruns and sessions
+@st.cache_resource(show_spinner="Initializing RAG system...")
+def get_rag_runtime():
+    runtime = LightRagRuntime()
+    try:
+        return runtime.start(start_rag)
+    except Exception:
+        runtime.stop()
+        raise
+
+
+async def cache_answer(answer_cache, key, response):
+    answer = ""
+    async for chunk in response:
+        answer += chunk
+        yield chunk
+    answer_cache.put(key, answer)
+
+
+async def query_rag(rag, user_input, mode=None):
+    mode = mode or str(os.environ.get("MODE"))
+    key = (mode, normalize_query(user_input))
+    answer = rag.answer_cache.get(key)
+    if answer is not None:
+        return answer
+
+    # Request streaming response by setting stream=True
+    response = await rag.aquery(user_input, param=QueryParam(mode=mode, stream=True))
+    if isinstance(response, str):
+        rag.answer_cache.put(key, response)
+        return response
+    return cache_answer(rag.answer_cache, key, response)
+
+
+async def stream_backend_response(user_input):
+    """Yield the response chunks the backend service streams"""
+    async for event in stream_events(
+        "/lightrag/query",
+        {
+            "question": user_input,
+            "session_id": st.session_state.session_id,
+            "mode": os.environ.get("MODE"),
+        },
+    ):
+        if event["type"] == "token":
+            yield event["text"]
+        elif event["type"] == "error":
+            yield f"The backend is busy, please try again: {event['message']}"
 
 
 async def generate_streaming_response(user_input):
     """Generate streaming response from RAG system"""
-    # Request streaming response by setting stream=True
-    response_generator = st.session_state.rag.query(
-        user_input,
-        param=QueryParam(mode=str(os.environ.get("MODE")), stream=True),
-    )
+    if BACKEND_URL:
+        response_generator = stream_backend_response(user_input)
+    else:
+        response_generator = get_rag_runtime().stream(query_rag, user_input)
 
     # Check if response is an async generator as expected
     if not inspect.isasyncgen(response_generator):
@@ -110,16 +281,17 @@ async def generate_streaming_response(user_input):
 async def main():
     st.title("LightRAG System")
 
-    if "rag" not in st.session_state:
-        with st.spinner("Initializing RAG system..."):
-            try:
-                rag = await initialize_rag()
-                st.session_state.rag = rag
-                load_data(rag)
-                st.success("RAG system initialized successfully!")
-            except Exception as e:
-                st.error(f"Failed to initialize RAG system: {str(e)}")
-                return
+    # identifies the session to the backend, a new question cancels the last
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+
+    # with a backend service the app only renders its responses
+    if not BACKEND_URL:
+        try:
+            get_rag_runtime()
+        except Exception as e:
+            st.error(f"Failed to initialize RAG system: {str(e)}")
+            return
     # Initialize chat history
     if "messages" not in st.session_state:
         st.session_state.messages = []
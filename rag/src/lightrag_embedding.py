@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent embeddings by content hash of the text and the model, in a
+    sqlite file. Unchanged chunks and entities are not embedded again after
+    a restart or re-insertion.
+    """
+
+    def __init__(self, path, model_name):
+        self.path = path
+        self.model_name = model_name
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+        )
+        self.connection.commit()
+        self.lock = threading.Lock()
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        with self.lock:
+            # sqlite limits the number of variables per statement
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                rows = self.connection.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, items):
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                [(key, vector.astype(np.float32).tobytes()) for key, vector in items],
+            )
+            self.connection.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()[0]
+
+
+class CachedEmbedding:
+    """
+    Embedding function between LightRAG and ollama. Cached texts are
+    answered from the EmbeddingCache, the others are deduplicated, grouped
+    into batches of at most max_batch_tokens (estimated) and embedded with
+    at most max_async concurrent requests. A batch ollama rejects is split
+    in half and retried.
+    """
+
+    def __init__(self, embed, model_name, cache_path, max_batch_tokens, max_async=4):
+        """
+        Args:
+            embed: Async function embedding a list of texts
+            model_name: Embedding model, part of the cache key
+            cache_path: Sqlite file of the cache
+            max_batch_tokens: Estimated tokens per embedding request
+            max_async: Concurrent embedding requests
+        """
+        self.embed = embed
+        self.cache = EmbeddingCache(cache_path, model_name)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_async = max_async
+        self.semaphore = None
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+
+    def __deepcopy__(self, memo):
+        # LightRAG deep copies its config, the cache and its connection are shared
+        return self
+
+    def count_tokens(self, text):
+        # rough estimate, it only bounds the size of a request
+        return len(text) // 4 + 1
+
+    def batches(self, texts):
+        batch, batch_tokens = [], 0
+        for text in texts:
+            tokens = self.count_tokens(text)
+            if batch and batch_tokens + tokens > self.max_batch_tokens:
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    async def embed_batch(self, texts):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_async)
+        try:
+            async with self.semaphore:
+                self.requests += 1
+                vectors = await self.embed(texts)
+        except Exception:
+            if len(texts) == 1:
+                raise
+            logger.warning(f"Embedding {len(texts)} texts failed, splitting the batch")
+            middle = len(texts) // 2
+            first, second = await asyncio.gather(
+                self.embed_batch(texts[:middle]), self.embed_batch(texts[middle:])
+            )
+            return first + second
+        return [np.asarray(vector, dtype=np.float32) for vector in vectors]
+
+    async def __call__(self, texts):
+        keys = [self.cache.key(text) for text in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            results = await asyncio.gather(
+                *(self.embed_batch(batch) for batch in self.batches(missing.values()))
+            )
+            vectors = [vector for result in results for vector in result]
+            self.cache.put_many(zip(missing, vectors))
+            found.update(zip(missing, vectors))
+
+        return np.array([found[key] for key in keys])
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "requests": self.requests,
+        }
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from lightrag.base import DocStatus
+from lightrag.utils import clean_text, compute_mdhash_id
+
+logger = logging.getLogger(__name__)
+
+
+def hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IngestionCheckpoint:
+    """
+    Remembers which documents LightRAG has processed, by file name and
+    content hash. It is saved after every batch, so a restarted ingestion
+    resumes with the first unfinished batch.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f)["files"]
+
+    def is_processed(self, file_name, content_hash):
+        entry = self.files.get(file_name)
+        return entry is not None and entry["hash"] == content_hash
+
+    def doc_id(self, file_name):
+        entry = self.files.get(file_name)
+        return entry["doc_id"] if entry is not None else None
+
+    def update(self, file_name, content_hash, doc_id):
+        self.files[file_name] = {"hash": content_hash, "doc_id": doc_id}
+
+    def remove(self, file_name):
+        self.files.pop(file_name, None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, indent=2)
+        # atomic replace, an interrupted save keeps the last checkpoint
+        os.replace(tmp_path, self.path)
+
+
+class LightRagIngestion:
+    """
+    Bulk insertion of a document directory into LightRAG. Documents already
+    processed, according to the checkpoint or the document status storage of
+    LightRAG, are skipped by content hash. The remaining ones are inserted in
+    batches with rag.ainsert, processing up to llm_model_max_async documents
+    at once.
+    """
+
+    def __init__(self, rag, document_dir, checkpoint_path, batch_size=None):
+        """
+        Args:
+            rag: Initialized LightRAG instance
+            document_dir: Directory with the documents to insert
+            checkpoint_path: Json file recording the processed documents
+            batch_size: Documents per ainsert call, defaults to the number
+            of documents processed at once
+        """
+        self.rag = rag
+        self.document_dir = document_dir
+        self.checkpoint = IngestionCheckpoint(checkpoint_path)
+        # the llm calls are limited by llm_model_max_async anyway, more
+        # documents in parallel keep all of these slots busy
+        self.concurrency = max(rag.llm_model_max_async, 1)
+        self.batch_size = batch_size or self.concurrency
+
+    def read_documents(self):
+        """Yield (file name, cleaned content) of every file in the directory"""
+        for file_name in sorted(os.listdir(self.document_dir)):
+            file_path = os.path.join(self.document_dir, file_name)
+            if os.path.isfile(file_path):
+                with open(file_path, "r", encoding="utf-8") as f:
+                    yield file_name, clean_text(f.read())
+
+    async def is_processed(self, doc_id):
+        status = await self.rag.doc_status.get_by_id(doc_id)
+        return status is not None and status["status"] == DocStatus.PROCESSED
+
+    async def delete_previous_version(self, file_name, doc_id):
+        """Delete the document of an edited file, which was inserted under its old id"""
+        previous_doc_id = self.checkpoint.doc_id(file_name)
+        if previous_doc_id is None or previous_doc_id == doc_id:
+            return
+        # removes its chunks, entities and relations from the graph, they
+        # would otherwise still be retrieved next to the new version
+        await self.rag.adelete_by_doc_id(previous_doc_id)
+        self.checkpoint.remove(file_name)
+        logger.info(f"Deleted the previous version of {file_name}")
+
+    async def pending_documents(self):
+        """Return (file name, content hash, doc id, content) of new documents"""
+        pending = []
+        for file_name, content in self.read_documents():
+            content_hash = hash_text(content)
+            if self.checkpoint.is_processed(file_name, content_hash):
+                continue
+            # same id as LightRAG generates, earlier insertions are recognized
+            doc_id = compute_mdhash_id(content, prefix="doc-")
+            if await self.is_processed(doc_id):
+                await self.delete_previous_version(file_name, doc_id)
+                self.checkpoint.update(file_name, content_hash, doc_id)
+                continue
+            pending.append((file_name, content_hash, doc_id, content))
+        self.checkpoint.save()
+        return pending
+
+    async def insert_batch(self, batch):
+        for file_name, _, doc_id, _ in batch:
+            await self.delete_previous_version(file_name, doc_id)
+        self.checkpoint.save()
+
+        file_names, _, doc_ids, contents = zip(*batch)
+        await self.rag.ainsert(
+            list(contents), ids=list(doc_ids), file_paths=list(file_names)
+        )
+
+        processed = []
+        for file_name, content_hash, doc_id, _ in batch:
+            # failed documents stay out of the checkpoint and are retried
+            if await self.is_processed(doc_id):
+                self.checkpoint.update(file_name, content_hash, doc_id)
+                processed.append(file_name)
+            else:
+                logger.warning(f"Failed to insert document {file_name}")
+        self.checkpoint.save()
+        return processed
+
+    async def run(self):
+        """Insert all new documents and return the names of the inserted ones"""
+        pending = await self.pending_documents()
+        if not pending:
+            logger.info("All documents are already inserted")
+            return []
+
+        previous_parallel_insert = self.rag.max_parallel_insert
+        self.rag.max_parallel_insert = self.concurrency
+        inserted = []
+        start = time.perf_counter()
+        try:
+            for i in range(0, len(pending), self.batch_size):
+                batch = pending[i : i + self.batch_size]
+                inserted.extend(await self.insert_batch(batch))
+                logger.info(
+                    f"Inserted {len(inserted)}/{len(pending)} documents "
+                    f"after {time.perf_counter() - start:.1f}s"
+                )
+        finally:
+            self.rag.max_parallel_insert = previous_parallel_insert
+        return inserted
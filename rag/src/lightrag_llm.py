@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# arguments of the llm call that do not change the response, all others
+# (e.g. the ollama options with num_ctx) are part of the cache key
+CONNECTION_KWARGS = ("hashing_kv", "host", "timeout", "api_key")
+
+
+class CompletionCache:
+    """
+    Persistent llm responses by hash of the model, the complete prompt and
+    the generation options, in a sqlite file. The entity extraction of an unchanged chunk is answered
+    from it, also after the graph was deleted and is built again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, response TEXT)"
+        )
+        self.connection.commit()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name, prompt, system_prompt, history_messages, **options):
+        data = json.dumps(
+            [model_name, system_prompt, history_messages, prompt, options],
+            sort_keys=True,
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT response FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, response):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?)", (key, response)
+            )
+            self.connection.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM completions"
+            ).fetchone()[0]
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit tuned by hill climbing on the observed throughput.
+    After every window of completed calls (window times the limit) the
+    processed characters per second are compared to the previous window:
+    while the throughput grows the limit keeps moving in the same direction,
+    if it drops the direction turns around and without a clear change the
+    limit is lowered. Ollama only processes OLLAMA_NUM_PARALLEL requests at
+    once, beyond that more concurrent calls just wait in its queue.
+    """
+
+    def __init__(self, initial=2, min_limit=1, max_limit=8, window=4, tolerance=0.05):
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.tolerance = tolerance
+        self.step = 1
+        self.active = 0
+        self.condition = None
+        self.window_start = None
+        self.window_calls = 0
+        self.window_work = 0
+        self.throughput = None
+
+    async def acquire(self):
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+            if self.window_start is None:
+                self.window_start = time.perf_counter()
+
+    async def release(self, work):
+        async with self.condition:
+            self.active -= 1
+            self.window_calls += 1
+            self.window_work += work
+            if self.window_calls >= self.window * self.limit:
+                self.adjust()
+            self.condition.notify_all()
+
+    def adjust(self):
+        throughput = self.window_work / (time.perf_counter() - self.window_start)
+        if self.throughput is not None:
+            change = throughput / self.throughput - 1
+            if change < -self.tolerance:
+                self.step = -self.step
+            elif change <= self.tolerance:
+                # more concurrency without more throughput only adds latency
+                self.step = -1
+        self.throughput = throughput
+        limit = min(max(self.limit + self.step, self.min_limit), self.max_limit)
+        if limit != self.limit:
+            logger.info(
+                f"LLM concurrency {self.limit} -> {limit} "
+                f"({throughput:.0f} characters/s)"
+            )
+        self.limit = limit
+        self.window_start = time.perf_counter()
+        self.window_calls = 0
+        self.window_work = 0
+
+
+class CachedCompletion:
+    """
+    llm_model_func between LightRAG and ollama. Complete responses (entity
+    extraction, gleaning, summaries and keywords) are cached in the
+    CompletionCache, streamed answers are passed through. Uncached calls run
+    with the concurrency of AdaptiveConcurrency.
+    """
+
+    def __init__(self, complete, model_name, cache_path, max_async=8):
+        """
+        Args:
+            complete: LightRAG llm function, e.g. ollama_model_complete
+            model_name: LLM, part of the cache key
+            cache_path: Sqlite file of the cache, None disables caching
+            max_async: Upper bound of the concurrent llm calls
+        """
+        self.complete = complete
+        self.model_name = model_name
+        self.cache = CompletionCache(cache_path) if cache_path else None
+        self.concurrency = AdaptiveConcurrency(max_limit=max_async)
+        self.hits = 0
+        self.misses = 0
+
+    def __deepcopy__(self, memo):
+        # LightRAG deep copies its config, the cache and its connection are shared
+        return self
+
+    async def __call__(
+        self,
+        prompt,
+        system_prompt=None,
+        history_messages=[],
+        keyword_extraction=False,
+        **kwargs,
+    ):
+        if kwargs.get("stream"):
+            return await self.complete(
+                prompt,
+                system_prompt=system_prompt,
+                history_messages=history_messages,
+                keyword_extraction=keyword_extraction,
+                **kwargs,
+            )
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(
+                self.model_name,
+                prompt,
+                system_prompt,
+                history_messages,
+                keyword_extraction=keyword_extraction,
+                **{
+                    name: value
+                    for name, value in kwargs.items()
+                    if name not in CONNECTION_KWARGS
+                },
+            )
+            response = self.cache.get(key)
+            if response is not None:
+                self.hits += 1
+                return response
+
+        self.misses += 1
+        await self.concurrency.acquire()
+        response = ""
+        try:
+            response = await self.complete(
+                prompt,
+                system_prompt=system_prompt,
+                history_messages=history_messages,
+                keyword_extraction=keyword_extraction,
+                **kwargs,
+            )
+        finally:
+            work = len(prompt) + len(system_prompt or "") + len(response)
+            await self.concurrency.release(work)
+        if key is not None:
+            self.cache.put(key, response)
+        return response
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.cache) if self.cache is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "concurrency": self.concurrency.limit,
+        }
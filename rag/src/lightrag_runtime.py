@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+
+class LightRagRuntime:
+    """
+    Runs a single LightRAG instance on a dedicated event loop thread. The
+    storages and locks of LightRAG are bound to the loop they are used on,
+    while every streamlit session runs its own loop. Sessions therefore
+    submit their coroutines to this loop instead of using the instance
+    directly, so all of them share one knowledge graph and vector store.
+    """
+
+    def __init__(self):
+        self.rag = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="lightrag", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def start(self, start_rag):
+        """Create the instance with the start_rag coroutine function, blocking"""
+        self.rag = self.submit(start_rag()).result()
+        return self
+
+    async def run(self, func, *args, **kwargs):
+        """Await func(rag, *args, **kwargs) on the loop of the instance"""
+        return await asyncio.wrap_future(self.submit(func(self.rag, *args, **kwargs)))
+
+    async def stream(self, func, *args, **kwargs):
+        """
+        Like run, for coroutines returning a string or an async iterator, as
+        rag.aquery does with stream=True. The chunks are yielded one by one.
+        """
+        result = await self.run(func, *args, **kwargs)
+        if isinstance(result, str):
+            yield result
+            return
+
+        async def next_chunk():
+            try:
+                return await result.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        try:
+            while True:
+                chunk = await asyncio.wrap_future(self.submit(next_chunk()))
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            # a consumer leaving early must not keep the llm stream open
+            if hasattr(result, "aclose"):
+                self.submit(result.aclose())
+
+    def stop(self):
+        if self.rag is not None:
+            self.submit(self.rag.finalize_storages()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
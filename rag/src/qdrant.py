@@ -1,7 +1,151 @@
+import asyncio
+import uuid
+import nest_asyncio
 import streamlit as st
+from backend_client import BACKEND_URL, get_json, post_json, stream_events
 from qdrant.db_manager import VectorDbManager
 from qdrant.llm_manager import LlmManager
 
+# required to run nested async event loops
+nest_asyncio.apply()
+
+
+# resources are cached per server process and shared by all reruns and sessions
+@st.cache_resource(show_spinner="Initializing vector database...")
+def get_db_manager(collection_name):
+    # sparse bm25 vectors help with project names and exact technical terms
+    db_manager = VectorDbManager(hybrid=True)
+    db_manager.init_qdrant(collection_name)
+    return db_manager
+
+
+@st.cache_resource(show_spinner="Initializing language model...")
+def get_llm_manager():
+    return LlmManager()
+
+
+def display_documents(documents):
+    with st.expander("View majority voted documents"):
+        for i, document in enumerate(documents):
+            st.markdown(f"### Document {i+1}")
+            st.write(f"### Source: \n {document['source']}")
+            st.write(f"### Content: \n {document['document']}")
+            st.divider()
+
+
+def display_timings(timings):
+    caption = (
+        f"First token after {timings.get('time_to_first_token', 0):.2f}s, "
+        f"complete after {timings.get('total', 0):.2f}s"
+    )
+    if "prefill" in timings:
+        caption += (
+            f", prefill {timings['prefill']:.2f}s "
+            f"(~{timings['prefill_saved']:.2f}s saved by the prompt cache)"
+        )
+    st.caption(caption)
+
+
+def display_cache_stats(cache_stats):
+    st.header("Cache")
+    for name, stats in cache_stats.items():
+        st.write(
+            f"{name}: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%})"
+        )
+
+
+async def stream_answer(llm_manager, db_manager, user_input, retrieval):
+    """Render the answer token by token and report its latency"""
+    timings = {}
+    response = ""
+    message_placeholder = st.empty()
+    async for piece in llm_manager.astream_response(
+        user_input=user_input,
+        retrieval=retrieval,
+        query_vector=db_manager.embed_query(user_input),
+        index_version=db_manager.collection_version,
+        timings=timings,
+    ):
+        response += piece
+        message_placeholder.markdown(response + "▌")
+    message_placeholder.markdown(response)
+    display_timings(timings)
+    return response
+
+
+async def stream_backend_answer(user_input):
+    """Render the retrieval and the answer streamed by the backend service"""
+    response = ""
+    message_placeholder = None
+    async for event in stream_events(
+        "/qdrant/query",
+        {"question": user_input, "session_id": st.session_state.session_id},
+    ):
+        if event["type"] == "retrieval":
+            display_documents(event["documents"])
+            st.subheader("Answer:")
+            message_placeholder = st.empty()
+        elif event["type"] == "token":
+            response += event["text"]
+            message_placeholder.markdown(response + "▌")
+        elif event["type"] == "error":
+            st.error(f"The backend is busy, please try again: {event['message']}")
+        elif event["type"] == "done":
+            message_placeholder.markdown(response)
+            display_timings(event["timings"])
+    return response
+
+
+def answer_locally(user_input):
+    # Get the cached database and LLM managers
+    db_manager = get_db_manager("projects")
+    llm_manager = get_llm_manager()
+
+    with st.spinner("Retrieving information..."):
+        # Retrieve the chunks of the top source in one grouped query
+        voted_retrieval = db_manager.retrieve_top_source(
+            user_input, group_size=7, aggregation="count"
+        )
+
+        # Display majority voted documents
+        display_documents([result.metadata for result in voted_retrieval])
+
+    # Stream the response of the LLM as it is generated
+    st.subheader("Answer:")
+    asyncio.run(stream_answer(llm_manager, db_manager, user_input, voted_retrieval))
+
+
+def display_local_resources():
+    # explicit invalidation, e.g. after documents were edited
+    if st.button("Reload documents"):
+        get_db_manager.clear()
+        st.rerun()
+    if st.button("Reload language model"):
+        get_llm_manager.clear()
+        st.rerun()
+
+    display_cache_stats(
+        {
+            **get_db_manager("projects").cache_stats(),
+            "answers": get_llm_manager().answer_cache.stats(),
+        }
+    )
+
+
+def display_backend_resources():
+    if st.button("Reload documents"):
+        asyncio.run(post_json("/qdrant/reload"))
+        st.rerun()
+
+    stats = asyncio.run(get_json("/stats"))
+    pool = stats["pool"]
+    st.write(
+        f"LLM requests: {pool['running']} running, {pool['waiting']} waiting, "
+        f"{pool['rejected']} rejected"
+    )
+    display_cache_stats(stats["caches"])
+
 
 def main():
     st.set_page_config(
@@ -13,72 +157,43 @@ def main():
         "Ask questions about a portfolio project and get answers based on retrieved information."
     )
 
-    # Initialize the database manager
-    db_manager = VectorDbManager()
-    db_manager.init_qdrant("projects")
-
-    # Initialize the LLM manager
-    llm_manager = LlmManager()
+    # identifies the session to the backend, a new question cancels the last
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
 
     # Create input field for user questions
     user_input = st.text_input("Enter your question:")
 
     # Add a button to trigger the search
     if st.button("Get Answer") or user_input:
-        with st.spinner("Retrieving information..."):
-            # Retrieve information from the vector database
-            raw_retrieval = db_manager.retrieve_information(user_input)
-            voted_retrieval = db_manager.majority_vote(raw_retrieval)
-
-            # Display retrieved documents (expandable)
-            with st.expander("View retrieved documents"):
-                for i, result in enumerate(raw_retrieval):
-                    st.markdown(f"### Document {i+1}")
-                    st.write(f"### Source: \n {result.metadata["source"]}")
-                    st.write(f"### Content: \n {result.metadata["document"]}")
-                    st.divider()
-
-            # Display majority voted documents
-            with st.expander("View majority voted documents"):
-                i = 0
-                for result in voted_retrieval:
-                    st.markdown(f"### Document {i+1}")
-                    st.write(f"### Source: \n {result.metadata["source"]}")
-                    st.write(f"### Content: \n {result.metadata["document"]}")
-                    st.divider()
-                    i += 1
-
-            # Generate response using LLM
-            with st.spinner("Generating response..."):
-                response = llm_manager.generate_response(
-                    user_input=user_input, retrieval=voted_retrieval
-                )
-
-            # Display the response
-            st.subheader("Answer:")
-            st.write(response)
+        if BACKEND_URL:
+            asyncio.run(stream_backend_answer(user_input))
+        else:
+            answer_locally(user_input)
 
     # Add some information about how it works
     with st.sidebar:
         st.header("How it works")
-        st.write(
-            """
+        st.write("""
         1. Your question is used to search the vector database.
         2. Relevant documents are retrieved.
-        3. A majority voting system selects the most relevant documents.
+        3. The hits are grouped by document and the best document is selected.
         4. An LLM generates a comprehensive answer based on the retrieved information.
-        """
-        )
+        """)
+
+        st.header("Resources")
+        if BACKEND_URL:
+            display_backend_resources()
+        else:
+            display_local_resources()
 
         st.header("About")
-        st.write(
-            """
+        st.write("""
         This app uses:
         - Qdrant for vector similarity search
         - A custom LLM manager for response generation
         - Streamlit for the user interface
-        """
-        )
+        """)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+import tiktoken
+from tokenizers import Tokenizer
+
+
+class TokenCounter:
+    """
+    Counts tokens with the tokenizer of the target model. llama3.1 ships its
+    tokenizer.json on huggingface, without it the cl100k_base encoding (the
+    BPE llama 3 extended) is a close approximation. If neither is available
+    (offline), about four characters per token are assumed.
+    """
+
+    def __init__(self, tokenizer_file=None, encoding_name="cl100k_base"):
+        """
+        Args:
+            tokenizer_file: Path to a huggingface tokenizer.json of the model
+            encoding_name: tiktoken encoding used without a tokenizer file
+        """
+        self.tokenizer = None
+        self.encoding = None
+        if tokenizer_file is not None:
+            self.tokenizer = Tokenizer.from_file(tokenizer_file)
+            return
+        try:
+            self.encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            print(f"Could not load {encoding_name}, estimating tokens: {e}")
+
+    def count(self, text):
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+
+def overlap_length(first, second, min_overlap, max_overlap):
+    """Length of the longest suffix of first that is a prefix of second."""
+    for length in range(min(len(first), len(second), max_overlap), min_overlap - 1, -1):
+        if first.endswith(second[:length]):
+            return length
+    return 0
+
+
+class ContextPacker:
+    """
+    Packs retrieved chunks into a context of limited size. Chunks are added
+    by score, best first, as long as they fit the token budget. Text that
+    is already part of the context, like the overlap between two adjacent
+    chunks of a split section, is removed before counting.
+    """
+
+    def __init__(
+        self, token_budget=1536, counter=None, min_overlap=32, max_overlap=512
+    ):
+        """
+        Args:
+            token_budget: Maximal number of context tokens
+            counter: TokenCounter, None uses the default one
+            min_overlap: Shorter common spans are not treated as overlap
+            max_overlap: Longest overlap searched for, in characters
+        """
+        self.token_budget = token_budget
+        self.counter = counter if counter is not None else TokenCounter()
+        self.min_overlap = min_overlap
+        self.max_overlap = max_overlap
+
+    def remove_overlap(self, text, selected):
+        """Strip the parts of text that selected chunks already contain."""
+        for other in selected:
+            if text in other:
+                return ""
+            length = overlap_length(other, text, self.min_overlap, self.max_overlap)
+            text = text[length:]
+            length = overlap_length(text, other, self.min_overlap, self.max_overlap)
+            text = text[: len(text) - length]
+        return text.strip()
+
+    def pack(self, retrieval):
+        """
+        Args:
+            retrieval: Retrieved chunks with score and metadata
+
+        Returns:
+            Context string and a dict with the used tokens and chunk counts
+        """
+        selected = {}
+        parts = []
+        used_tokens = 0
+        skipped = 0
+
+        for doc in sorted(retrieval, key=lambda doc: doc.score, reverse=True):
+            source = doc.metadata["source"]
+            text = self.remove_overlap(
+                doc.metadata["document"], selected.get(source, [])
+            )
+            if not text:
+                skipped += 1
+                continue
+
+            header = "" if source in selected else f"\n## Reference:{source}\n"
+            part = f"{header}## Content: {text}\n"
+            tokens = self.counter.count(part)
+            if used_tokens + tokens > self.token_budget:
+                # a smaller chunk with a lower score may still fit
+                skipped += 1
+                continue
+
+            selected.setdefault(source, []).append(doc.metadata["document"])
+            parts.append(part)
+            used_tokens += tokens
+
+        stats = {"tokens": used_tokens, "chunks": len(parts), "skipped": skipped}
+        return "".join(parts), stats
@@ -1,48 +1,379 @@
-from qdrant_client import QdrantClient
+from fastembed import SparseTextEmbedding, TextEmbedding
+from qdrant_client import QdrantClient, models
+from qdrant_client.fastembed_common import QueryResponse
 from document_processing import DocumentProcessor
+from qdrant.ingestion import IngestionManifest, chunk_id, hash_chunk, hash_file
+from qdrant.indexing import IndexingPipeline
+from qdrant.query_cache import QueryCache, normalize_query
+from qdrant.storage import StorageOptions
+
+DOCUMENT_DIR = "resources/documents"
+MANIFEST_DIR = "resources/index"
+AGGREGATIONS = ("count", "sum", "max")
+SPARSE_VECTOR_NAME = "sparse-text"
 
 
 class VectorDbManager:
 
-    def __init__(self):
-        self.client = QdrantClient(url="http://localhost:6333")
+    def __init__(
+        self,
+        location="http://localhost:6333",
+        batch_size=256,
+        parallel=None,
+        threads=None,
+        cache_size=1024,
+        result_ttl=600,
+        hybrid=False,
+        sparse_model_name="Qdrant/bm25",
+        storage=None,
+    ):
+        """
+        Args:
+            location: Qdrant url, or ":memory:" / a path for the local mode
+            batch_size: Number of chunks per upsert while indexing
+            parallel: Number of embedding worker processes while indexing,
+            0 uses all cores, None embeds in the current process
+            threads: Number of onnxruntime threads per embedding model
+            cache_size: Number of cached query embeddings and search results
+            result_ttl: Seconds a cached search result stays valid
+            hybrid: Store sparse vectors next to the dense ones and fuse both
+            rankings with reciprocal rank fusion
+            sparse_model_name: fastembed sparse model used in hybrid mode,
+            e.g. "Qdrant/bm25" or "prithivida/Splade_PP_en_v1"
+            storage: StorageOptions for quantization, on disk storage and the
+            HNSW index, None keeps all vectors in RAM with the defaults
+        """
+        self.client = QdrantClient(location=location)
         print("client initiated")
         self.collection_name = ""
+        self.collection_version = 0
+        self.indexing_options = {
+            "batch_size": batch_size,
+            "parallel": parallel,
+            "threads": threads,
+        }
+        self.sparse_model_name = sparse_model_name if hybrid else None
+        self.storage = storage if storage is not None else StorageOptions()
+        self.query_model = None
+        self.sparse_query_model = None
+        # embeddings only depend on the model, results also on the collection
+        self.embedding_cache = QueryCache(max_size=cache_size)
+        self.result_cache = QueryCache(max_size=cache_size, ttl=result_ttl)
 
     def init_qdrant(self, collection_name):
-        processor = DocumentProcessor("resources/documents")
-        docs = processor.load_documents()
-        chunked_docs = processor.chunk_documents(docs)
-        content, metadata = processor.split_metadata(chunked_docs)
+        manifest = IngestionManifest(f"{MANIFEST_DIR}/{collection_name}.json")
 
-        if not self.client.collection_exists(collection_name):
+        if (
+            not self.client.collection_exists(collection_name)
+            or not manifest.exists()
+            or manifest.sparse_model != self.sparse_model_name
+        ):
+            # collections without manifest use random ids and can't be synced,
+            # switching the sparse model needs all chunks embedded again
+            if self.client.collection_exists(collection_name):
+                self.client.delete_collection(collection_name)
             self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config=self.client.get_fastembed_vector_params(),
+                vectors_config=self.storage.vectors_config(self.client),
+                sparse_vectors_config=self.sparse_vectors_config(),
+                on_disk_payload=self.storage.on_disk_payload,
             )
+            manifest.reset()
+            manifest.sparse_model = self.sparse_model_name
+            manifest.storage = self.storage.settings()
             print("collection created")
-            self.client.add(
+        elif manifest.storage != self.storage.settings():
+            # storage settings don't need new embeddings, update in place
+            self.client.update_collection(
+                collection_name=collection_name,
+                vectors_config=self.storage.vectors_update(self.client),
+                collection_params=models.CollectionParamsDiff(
+                    on_disk_payload=self.storage.on_disk_payload
+                ),
+            )
+            manifest.storage = self.storage.settings()
+            print("collection storage updated")
+
+        if "source" not in self.client.get_collection(collection_name).payload_schema:
+            # speeds up grouping and filtering by source
+            self.client.create_payload_index(
                 collection_name=collection_name,
-                documents=content,
-                metadata=metadata,
+                field_name="source",
+                field_schema=models.PayloadSchemaType.KEYWORD,
             )
-            print("added documents")
 
         self.collection_name = collection_name
+        self.sync_documents(manifest)
+        if manifest.version != self.collection_version:
+            # cached results may contain changed or deleted chunks
+            self.result_cache.clear()
+        self.collection_version = manifest.version
+        # load the embedding models now instead of on the first query
+        self.get_query_model()
+        if self.sparse_model_name is not None:
+            self.get_sparse_query_model()
         print("Initiation successful")
 
-    def retrieve_information(self, search_query):
-        # embed search query and search
-        search_result = self.client.query(
+    def sync_documents(self, manifest):
+        """
+        Bring the collection in line with the document directory. Unchanged
+        files are skipped by their content hash, only new chunks of changed
+        files are embedded and chunks of changed or deleted files are removed.
+        If the chunker settings changed, every file is chunked again.
+        """
+        processor = DocumentProcessor(DOCUMENT_DIR)
+        files = processor.list_files()
+        changed_files = []
+        rechunk = manifest.chunker != processor.chunker.settings()
+
+        pipeline = IndexingPipeline(
+            self.client,
+            self.collection_name,
+            sparse_model_name=self.sparse_model_name,
+            sparse_vector_name=SPARSE_VECTOR_NAME,
+            **self.indexing_options,
+        )
+        indexed = pipeline.index(
+            self.new_chunks(processor, files, manifest, changed_files, rechunk)
+        )
+        print(f"indexed {indexed} new chunks")
+
+        for file_path in set(manifest.files) - set(files):
+            self.delete_chunks(manifest.chunk_ids(file_path))
+            manifest.remove(file_path)
+            changed_files.append(file_path)
+            print(f"removed {file_path}")
+
+        if changed_files:
+            manifest.version += 1
+        manifest.chunker = processor.chunker.settings()
+        manifest.save()
+
+    def new_chunks(self, processor, files, manifest, changed_files, rechunk=False):
+        """
+        Yield (point_id, text, metadata) for every chunk that is not indexed
+        yet, file by file, and delete the chunks that disappeared.
+        """
+        for file_path in files:
+            file_hash = hash_file(file_path)
+            if manifest.file_hash(file_path) == file_hash and not rechunk:
+                continue
+
+            known_ids = set(manifest.chunk_ids(file_path))
+            chunk_hashes = []
+            ids = set()
+            new = 0
+            for content, metadata in processor.iter_file_chunks(file_path):
+                chunk_hash = hash_chunk(content, metadata)
+                id = chunk_id(file_path, chunk_hash)
+                chunk_hashes.append(chunk_hash)
+                ids.add(id)
+                if id not in known_ids:
+                    new += 1
+                    yield id, content, metadata
+            self.delete_chunks(known_ids - ids)
+
+            manifest.update(file_path, file_hash, chunk_hashes)
+            changed_files.append(file_path)
+            print(f"{file_path}: {new} new of {len(chunk_hashes)} chunks")
+
+    def delete_chunks(self, ids):
+        if ids:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=list(ids)),
+            )
+
+    def sparse_vectors_config(self):
+        if self.sparse_model_name is None:
+            return None
+        # bm25 and bm42 only store term frequencies, idf is computed by qdrant
+        modifier = None
+        if "bm25" in self.sparse_model_name or "bm42" in self.sparse_model_name:
+            modifier = models.Modifier.IDF
+        return {SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=modifier)}
+
+    def get_query_model(self):
+        if self.query_model is None:
+            self.query_model = TextEmbedding(
+                model_name=self.client.embedding_model_name,
+                threads=self.indexing_options["threads"],
+            )
+        return self.query_model
+
+    def embed_query(self, search_query):
+        key = (self.client.embedding_model_name, normalize_query(search_query))
+        vector = self.embedding_cache.get(key)
+        if vector is None:
+            vector = next(iter(self.get_query_model().query_embed(search_query)))
+            vector = vector.tolist()
+            self.embedding_cache.put(key, vector)
+        return vector
+
+    def get_sparse_query_model(self):
+        if self.sparse_query_model is None:
+            self.sparse_query_model = SparseTextEmbedding(
+                model_name=self.sparse_model_name,
+                threads=self.indexing_options["threads"],
+            )
+        return self.sparse_query_model
+
+    def embed_sparse_query(self, search_query):
+        key = (self.sparse_model_name, normalize_query(search_query))
+        vector = self.embedding_cache.get(key)
+        if vector is None:
+            embedding = next(
+                iter(self.get_sparse_query_model().query_embed(search_query))
+            )
+            vector = models.SparseVector(
+                indices=embedding.indices.tolist(), values=embedding.values.tolist()
+            )
+            self.embedding_cache.put(key, vector)
+        return vector
+
+    def query_arguments(self, search_query, prefetch_limit):
+        """
+        Query arguments for query_points and query_points_groups. In hybrid
+        mode the dense and sparse candidates are fused with reciprocal rank
+        fusion, otherwise the dense vector is searched directly.
+        """
+        dense = self.embed_query(search_query)
+        vector_name = self.client.get_vector_field_name()
+        search_params = self.storage.search_params()
+        if self.sparse_model_name is None:
+            return {
+                "query": dense,
+                "using": vector_name,
+                "search_params": search_params,
+            }
+
+        return {
+            "prefetch": [
+                models.Prefetch(
+                    query=dense,
+                    using=vector_name,
+                    params=search_params,
+                    limit=prefetch_limit,
+                ),
+                models.Prefetch(
+                    query=self.embed_sparse_query(search_query),
+                    using=SPARSE_VECTOR_NAME,
+                    limit=prefetch_limit,
+                ),
+            ],
+            "query": models.FusionQuery(fusion=models.Fusion.RRF),
+        }
+
+    def retrieve_information(self, search_query, limit=7):
+        """
+        Embed the search query and search the collection. Repeated questions
+        are answered from the cache without embedding or searching, until the
+        collection version changes or the result expires.
+        """
+        key = (self.collection_version, normalize_query(search_query), limit)
+        search_result = self.result_cache.get(key)
+        if search_result is not None:
+            return list(search_result)
+
+        points = self.client.query_points(
             collection_name=self.collection_name,
-            query_text=search_query,
             query_filter=None,  # If you don't want any filters for now
-            limit=7,
+            limit=limit,
+            with_payload=True,
+            **self.query_arguments(search_query, prefetch_limit=limit * 3),
+        ).points
+        search_result = self.to_query_responses(points)
+
+        self.result_cache.put(key, search_result)
+        return list(search_result)
+
+    def retrieve_top_source(self, search_query, group_size=7, aggregation="count"):
+        """
+        Retrieve the chunks of the most relevant source in a single grouped
+        query. Qdrant groups the hits by source on the server, so only the
+        best chunks of the candidate sources are transferred. Replaces
+        retrieve_information followed by majority_vote.
+
+        Args:
+            search_query: Question to search for
+            group_size: Number of chunks returned for the top source, also the
+            number of overall best hits the count and sum aggregations rank by
+            aggregation: How the sources are ranked, "count" of hits among
+            the overall best hits (like majority_vote), "sum" of their scores
+            or "max" score of the best hit
+
+        Returns:
+            The chunks of the top source, best first
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(
+                f"Unknown aggregation {aggregation}, use one of {AGGREGATIONS}"
+            )
+
+        key = (
+            self.collection_version,
+            normalize_query(search_query),
+            "top_source",
+            group_size,
+            aggregation,
         )
+        search_result = self.result_cache.get(key)
+        if search_result is not None:
+            return list(search_result)
+
+        # groups are ordered by their best hit, a source with one of the
+        # group_size best hits is therefore among the first group_size groups.
+        # The candidates are the same as in retrieve_information.
+        groups = self.client.query_points_groups(
+            collection_name=self.collection_name,
+            group_by="source",
+            limit=group_size,
+            group_size=group_size,
+            with_payload=True,
+            **self.query_arguments(search_query, prefetch_limit=group_size * 3),
+        ).groups
+        if not groups:
+            return []
+
+        # each group holds the best hits of its source, so the best hits of
+        # all groups are the overall best hits
+        scores = sorted((hit.score for group in groups for hit in group.hits))
+        cutoff = scores[-min(group_size, len(scores))]
+
+        def rank(group):
+            top_scores = [hit.score for hit in group.hits if hit.score >= cutoff]
+            if aggregation == "count":
+                # ties go to the source with the best hit, like majority_vote
+                return len(top_scores), group.hits[0].score
+            if aggregation == "sum":
+                return sum(top_scores)
+            return group.hits[0].score
+
+        top_group = max(groups, key=rank)
+        search_result = self.to_query_responses(top_group.hits)
+
+        self.result_cache.put(key, search_result)
+        return list(search_result)
+
+    def to_query_responses(self, points):
+        return [
+            QueryResponse(
+                id=point.id,
+                embedding=None,
+                metadata=point.payload,
+                document=point.payload.get("document", ""),
+                score=point.score,
+            )
+            for point in points
+        ]
 
-        return search_result
+    def cache_stats(self):
+        return {
+            "embeddings": self.embedding_cache.stats(),
+            "results": self.result_cache.stats(),
+        }
 
-    # just for fun could also simple metadata filter from qdrant
+    # variant of retrieve_top_source(aggregation="count") on given hits
     def majority_vote(self, retrieval):
         # Extract all source IDs
         ids = [candidate.metadata["source"] for candidate in retrieval]
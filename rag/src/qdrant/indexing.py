@@ -0,0 +1,141 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from fastembed import SparseTextEmbedding, TextEmbedding
+from qdrant_client import models
+
+
+class IndexingPipeline:
+    """
+    Embeds a stream of chunks with fastembed and upserts them in bounded
+    batches. fastembed consumes the stream lazily (with `parallel` worker
+    processes if set) while the previous batch is upserted in the background,
+    so memory stays bounded and embedding never waits for the database. If a
+    sparse model is set, a sparse vector is stored next to the dense one.
+    """
+
+    def __init__(
+        self,
+        client,
+        collection_name,
+        batch_size=256,
+        embed_batch_size=32,
+        parallel=None,
+        threads=None,
+        sparse_model_name=None,
+        sparse_vector_name=None,
+    ):
+        """
+        Args:
+            client: QdrantClient the collection belongs to
+            collection_name: Collection to upsert into
+            batch_size: Number of points per upsert request
+            embed_batch_size: Number of texts per embedding batch
+            parallel: Number of embedding worker processes, 0 uses all cores,
+            None embeds in the current process
+            threads: Number of onnxruntime threads per embedding model
+            sparse_model_name: fastembed sparse model, None only embeds dense
+            sparse_vector_name: Name of the sparse vector in the collection
+        """
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+        self.parallel = parallel
+        self.threads = threads
+        self.sparse_model_name = sparse_model_name
+        self.sparse_vector_name = sparse_vector_name
+        self.model = None
+        self.sparse_model = None
+
+    def get_model(self):
+        # only loaded once there actually is something to embed
+        if self.model is None:
+            self.model = TextEmbedding(
+                model_name=self.client.embedding_model_name, threads=self.threads
+            )
+        return self.model
+
+    def get_sparse_model(self):
+        if self.sparse_model is None:
+            self.sparse_model = SparseTextEmbedding(
+                model_name=self.sparse_model_name, threads=self.threads
+            )
+        return self.sparse_model
+
+    def index(self, chunks):
+        """
+        Embed and upsert chunks.
+
+        Args:
+            chunks: Iterable of (point_id, text, metadata) tuples
+
+        Returns:
+            Number of indexed chunks
+        """
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            return 0
+        chunks = itertools.chain([first], chunks)
+
+        # tee only buffers the chunks fastembed has read ahead
+        if self.sparse_model_name is None:
+            chunks, texts = itertools.tee(chunks)
+            sparse_vectors = itertools.repeat(None)
+        else:
+            chunks, texts, sparse_texts = itertools.tee(chunks, 3)
+            sparse_vectors = self.get_sparse_model().passage_embed(
+                (text for _, text, _ in sparse_texts),
+                batch_size=self.embed_batch_size,
+                parallel=self.parallel,
+            )
+        vectors = self.get_model().passage_embed(
+            (text for _, text, _ in texts),
+            batch_size=self.embed_batch_size,
+            parallel=self.parallel,
+        )
+        vector_name = self.client.get_vector_field_name()
+
+        count = 0
+        pending = None
+        with ThreadPoolExecutor(max_workers=1) as upserter:
+            while True:
+                batch = list(
+                    itertools.islice(
+                        zip(chunks, vectors, sparse_vectors), self.batch_size
+                    )
+                )
+                if not batch:
+                    break
+                points = [
+                    models.PointStruct(
+                        id=point_id,
+                        vector=self.point_vectors(vector_name, vector, sparse_vector),
+                        payload={"document": text, **metadata},
+                    )
+                    for (point_id, text, metadata), vector, sparse_vector in batch
+                ]
+                # at most one upsert in flight while the next batch embeds
+                if pending is not None:
+                    pending.result()
+                pending = upserter.submit(
+                    self.client.upsert,
+                    collection_name=self.collection_name,
+                    points=points,
+                    wait=True,
+                )
+                count += len(points)
+                print(f"embedded {count} chunks")
+            if pending is not None:
+                pending.result()
+
+        return count
+
+    def point_vectors(self, vector_name, vector, sparse_vector):
+        vectors = {vector_name: vector.tolist()}
+        if sparse_vector is not None:
+            vectors[self.sparse_vector_name] = models.SparseVector(
+                indices=sparse_vector.indices.tolist(),
+                values=sparse_vector.values.tolist(),
+            )
+        return vectors
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import uuid
+
+# fixed namespace, so the same chunk always maps to the same point id
+CHUNK_NAMESPACE = uuid.UUID("6f1c0e4a-4a52-4d8e-9a8e-3b7f1d2c5e90")
+
+
+def hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_file(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def hash_chunk(content, metadata):
+    # the section path is stored in the payload, a renamed parent heading
+    # has to change the id of the unchanged chunks below it as well
+    return hash_text(f"{metadata.get('section', '')}\n{content}")
+
+
+def chunk_id(source, chunk_hash):
+    # deterministic point id, re-ingesting a chunk overwrites instead of duplicating
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{source}:{chunk_hash}"))
+
+
+class IngestionManifest:
+    """
+    Keeps track of what is indexed in a collection: the content hash of every
+    file and the hashes of the chunks it was split into, together with the
+    chunker settings, sparse model and storage settings of the collection.
+    The version is bumped whenever the indexed content changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = 0
+        self.chunker = {}
+        self.sparse_model = None
+        self.storage = {}
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.version = data["version"]
+            self.chunker = data.get("chunker", {})
+            self.sparse_model = data.get("sparse_model")
+            self.storage = data.get("storage", {})
+            self.files = data["files"]
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def file_hash(self, source):
+        entry = self.files.get(source)
+        return entry["hash"] if entry else None
+
+    def chunk_ids(self, source):
+        entry = self.files.get(source, {"chunks": []})
+        return [chunk_id(source, chunk_hash) for chunk_hash in entry["chunks"]]
+
+    def update(self, source, file_hash, chunk_hashes):
+        self.files[source] = {"hash": file_hash, "chunks": chunk_hashes}
+
+    def remove(self, source):
+        self.files.pop(source, None)
+
+    def reset(self):
+        self.files = {}
+        self.version += 1
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            data = {
+                "version": self.version,
+                "chunker": self.chunker,
+                "sparse_model": self.sparse_model,
+                "storage": self.storage,
+                "files": self.files,
+            }
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -1,44 +1,191 @@
+import time
 from langchain.chat_models import init_chat_model
+from qdrant.context_packing import ContextPacker, TokenCounter
+from qdrant.query_cache import SemanticCache
+
+SYSTEM_PROMPT = """You are a helpful assistant that answers the user query \
+based on the given context. Generate a response that is precisely based on the \
+given context. Do not add any information. If the user query cannot be answered \
+based on the given context, answer with 'I am sorry, I don't know'.
+
+Reflect if your response would contain all informations of the context.
+It is important to preserve all given informations in your response."""
 
 
 class LlmManager:
 
+    def __init__(
+        self,
+        cache_size=256,
+        cache_threshold=0.95,
+        context_tokens=1536,
+        tokenizer_file=None,
+        keep_alive="30m",
+    ):
+        """
+        Args:
+            cache_size: Number of cached answers
+            cache_threshold: Minimal cosine similarity between two questions
+            to answer them with the same cached response
+            context_tokens: Token budget of the retrieved context, ollama
+            truncates prompts longer than the num_ctx of the model (2048)
+            tokenizer_file: tokenizer.json of the model to count tokens,
+            None approximates the llama 3 tokenizer
+            keep_alive: How long ollama keeps the model and its prompt cache
+            loaded after a request
+        """
+        # created once, the chat model is reused for every question
+        self.model = init_chat_model(
+            "llama3.1:8b",
+            model_provider="ollama",
+            temperature=0.3,
+            keep_alive=keep_alive,
+        )
+        # answers are scoped by the retrieved chunks and the index version
+        self.answer_cache = SemanticCache(
+            max_size=cache_size, threshold=cache_threshold
+        )
+        self.index_version = None
+        self.context_packer = ContextPacker(
+            token_budget=context_tokens, counter=TokenCounter(tokenizer_file)
+        )
+
     def create_context_from_retrieval(self, retrieval):
-        result = ""
-        for doc in retrieval:
-            part = ""
-            if result == "":
-                print("added result reference")
-                part += f"\n## Reference:{doc.metadata["source"]}\n"
-            part += f"## Content: {doc.metadata["document"]}"
-            result += part
-        return result
-
-    def generate_response(self, user_input, retrieval):
-        context = self.create_context_from_retrieval(retrieval)
-        prompt = self.generate_prompt(user_input, context)
-        print(f"Generated Prompt: {prompt}")
-        model = init_chat_model("llama3.1:8b", model_provider="ollama", temperature=0.3)
-        response = model.invoke(prompt)
+        context, stats = self.context_packer.pack(retrieval)
+        print(
+            f"packed {stats['chunks']} chunks into {stats['tokens']} context "
+            f"tokens, skipped {stats['skipped']}"
+        )
+        return context
+
+    def generate_response(
+        self, user_input, retrieval, query_vector=None, index_version=None
+    ):
+        """
+        Generate an answer for the user input based on the retrieval. If the
+        query embedding is given, a cached answer for a similar question over
+        the same retrieved chunks is returned instead of generating a new one.
+        """
+        if query_vector is None:
+            return self.generate_uncached_response(user_input, retrieval)
+
+        start = time.perf_counter()
+        scope = frozenset(doc.id for doc in retrieval)
+        response = self.cached_answer(query_vector, scope, index_version)
+        if response is not None:
+            print(f"Answer cache hit after {time.perf_counter() - start:.4f}s")
+            return response
+
+        response = self.generate_uncached_response(user_input, retrieval)
+        self.answer_cache.put(query_vector, scope, response)
+        return response
+
+    def cached_answer(self, query_vector, scope, index_version):
+        if index_version != self.index_version:
+            # chunks of an older index may have been edited or removed
+            self.answer_cache.clear()
+            self.index_version = index_version
+        return self.answer_cache.get(query_vector, scope)
+
+    def generate_uncached_response(self, user_input, retrieval):
+        prompt = self.prepare_prompt(user_input, retrieval)
+        response = self.model.invoke(prompt)
         print("Successfully generated response")
+        self.log_prefill(prompt, response.response_metadata, {})
         return response.content
 
-    def generate_prompt(self, user_input, context):
-        return f"""You are a helpful assistant that answers the following 
-        user query based on the given context.Generate a response that is 
-        precisely based on the given context. Do not add any information. 
-        If the user query cannot be answered based on the given context, 
-        answer with 'I am sorry, I don't know'.
+    async def astream_response(
+        self,
+        user_input,
+        retrieval,
+        query_vector=None,
+        index_version=None,
+        timings=None,
+    ):
+        """
+        Async generator yielding the answer piece by piece as the model
+        generates it. Uses the same answer cache as generate_response, a
+        cached answer is yielded at once.
 
-        Here is the user query you should answer:
-            {user_input}
+        Args:
+            timings: Optional dict, filled with the seconds until the first
+            token ("time_to_first_token") and until the end ("total")
+        """
+        timings = timings if timings is not None else {}
+        start = time.perf_counter()
+        scope = frozenset(doc.id for doc in retrieval)
 
+        if query_vector is not None:
+            response = self.cached_answer(query_vector, scope, index_version)
+            if response is not None:
+                timings["time_to_first_token"] = time.perf_counter() - start
+                timings["total"] = timings["time_to_first_token"]
+                yield response
+                return
 
-        Here is the given context:
-            {context}
-        
+        prompt = self.prepare_prompt(user_input, retrieval)
+        response = ""
+        metadata = {}
+        # coroutine handling requires async consumption
+        # because the default callback manager functions
+        # need to be awaited
+        async for chunk in self.model.astream(prompt):
+            # the statistics come with the last, empty chunk
+            metadata = chunk.response_metadata or metadata
+            if not chunk.content:
+                continue
+            if not response:
+                timings["time_to_first_token"] = time.perf_counter() - start
+            response += chunk.content
+            yield chunk.content
+        timings["total"] = time.perf_counter() - start
+        print(
+            f"Streamed response, first token after "
+            f"{timings.get('time_to_first_token', timings['total']):.2f}s, "
+            f"total {timings['total']:.2f}s"
+        )
+        self.log_prefill(prompt, metadata, timings)
 
-        Reflect if your response would contain all informations of the context.
-        It is important to preserve all given informations in your response.
+        if query_vector is not None:
+            self.answer_cache.put(query_vector, scope, response)
 
+    def prepare_prompt(self, user_input, retrieval):
+        context = self.create_context_from_retrieval(retrieval)
+        prompt = self.generate_prompt(user_input, context)
+        print(f"Generated Prompt: {prompt[-1][1]}")
+        return prompt
+
+    def generate_prompt(self, user_input, context):
+        # the instructions lead every prompt unchanged, so ollama can reuse
+        # their kv-cache and only has to prefill the context and the query
+        return [
+            ("system", SYSTEM_PROMPT),
+            (
+                "human",
+                f"Here is the given context:\n{context}\n\n"
+                f"Here is the user query you should answer:\n{user_input}",
+            ),
+        ]
+
+    def log_prefill(self, prompt, metadata, timings):
+        """
+        Read the prefill statistics ollama returns with the last message.
+        Tokens of a cached prefix are not evaluated again, the time they would
+        have taken is estimated with the prefill time per evaluated token.
         """
+        evaluated = metadata.get("prompt_eval_count")
+        duration = metadata.get("prompt_eval_duration")
+        if not evaluated or duration is None:
+            return
+        prompt_tokens = sum(
+            self.context_packer.counter.count(text) for _, text in prompt
+        )
+        reused = max(prompt_tokens - evaluated, 0)
+        timings["prefill"] = duration / 1e9
+        timings["prompt_tokens_evaluated"] = evaluated
+        timings["prompt_tokens_reused"] = reused
+        timings["prefill_saved"] = reused * timings["prefill"] / evaluated
+        print(
+            f"Prefilled {evaluated} prompt tokens in {timings['prefill']:.2f}s, "
+            f"~{reused} reused from cache saved ~{timings['prefill_saved']:.2f}s"
+        )
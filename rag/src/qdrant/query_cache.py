@@ -0,0 +1,149 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_MISSING = object()
+
+
+def normalize_query(query):
+    # repeated questions often only differ in case and whitespace
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class QueryCache:
+    """
+    Thread safe LRU cache with an optional time to live. The streamlit app
+    shares one VectorDbManager between all sessions, so lookups can happen
+    concurrently. Hits and misses are counted for monitoring.
+    """
+
+    def __init__(self, max_size=256, ttl=None):
+        """
+        Args:
+            max_size: Number of entries kept before the least recently used
+            one is evicted
+            ttl: Seconds an entry stays valid, None keeps entries until evicted
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            value, expires = self.entries.get(key, (_MISSING, None))
+            if value is not _MISSING and expires is not None:
+                if time.monotonic() >= expires:
+                    del self.entries[key]
+                    value = _MISSING
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SemanticCache:
+    """
+    Cache for values that are equally valid for similar queries. An entry is
+    returned if it was stored for the same scope (e.g. the retrieved chunks)
+    and its query embedding has a cosine similarity of at least the threshold.
+    Entries are evicted least recently used first.
+    """
+
+    def __init__(self, max_size=256, threshold=0.95, ttl=None):
+        """
+        Args:
+            max_size: Number of entries kept before the least recently used
+            one is evicted
+            threshold: Minimal cosine similarity between two query embeddings
+            to reuse an entry
+            ttl: Seconds an entry stays valid, None keeps entries until evicted
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, vector, scope, default=None):
+        vector = self.normalize(vector)
+        now = time.monotonic()
+        with self.lock:
+            best_id, best_score = None, self.threshold
+            for entry_id, (entry_scope, entry_vector, value, expires) in list(
+                self.entries.items()
+            ):
+                if expires is not None and now >= expires:
+                    del self.entries[entry_id]
+                    continue
+                if entry_scope != scope:
+                    continue
+                score = float(np.dot(vector, entry_vector))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(best_id)
+            self.hits += 1
+            return self.entries[best_id][2]
+
+    def put(self, vector, scope, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.entries[self.next_id] = (scope, self.normalize(vector), value, expires)
+            self.next_id += 1
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
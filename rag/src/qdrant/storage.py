@@ -0,0 +1,102 @@
+from qdrant_client import models
+
+QUANTIZATIONS = (None, "scalar", "binary")
+
+
+class StorageOptions:
+    """
+    How the dense vectors of a collection are stored and indexed. Quantized
+    vectors stay in RAM while the original vectors can be moved to disk, they
+    are only read to rescore the best candidates of a search.
+    """
+
+    def __init__(
+        self,
+        quantization=None,
+        on_disk=False,
+        on_disk_payload=False,
+        hnsw_m=None,
+        hnsw_ef_construct=None,
+        rescore=True,
+        oversampling=2.0,
+    ):
+        """
+        Args:
+            quantization: None, "scalar" (int8, 4x smaller) or "binary"
+            (1 bit per dimension, 32x smaller)
+            on_disk: Keep the original vectors on disk (memmapped)
+            on_disk_payload: Keep the payloads on disk
+            hnsw_m: Edges per node of the HNSW graph, None uses the server
+            default (16), fewer edges need less RAM but lower the recall
+            hnsw_ef_construct: Neighbours considered while building the
+            graph, None uses the server default (100)
+            rescore: Rescore quantized candidates with the original vectors
+            oversampling: Factor of additional quantized candidates fetched
+            for rescoring
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown quantization {quantization}, use one of {QUANTIZATIONS}"
+            )
+        self.quantization = quantization
+        self.on_disk = on_disk
+        self.on_disk_payload = on_disk_payload
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.rescore = rescore
+        self.oversampling = oversampling
+
+    def settings(self):
+        # collection level settings, the search settings can change any time
+        return {
+            "quantization": self.quantization,
+            "on_disk": self.on_disk,
+            "on_disk_payload": self.on_disk_payload,
+            "hnsw_m": self.hnsw_m,
+            "hnsw_ef_construct": self.hnsw_ef_construct,
+        }
+
+    def quantization_config(self):
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        return None
+
+    def hnsw_config(self):
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def vectors_config(self, client):
+        return client.get_fastembed_vector_params(
+            on_disk=self.on_disk,
+            quantization_config=self.quantization_config(),
+            hnsw_config=self.hnsw_config(),
+        )
+
+    def vectors_update(self, client):
+        # changes an existing collection in place, qdrant rebuilds the index
+        return {
+            client.get_vector_field_name(): models.VectorParamsDiff(
+                on_disk=self.on_disk,
+                quantization_config=self.quantization_config()
+                or models.Disabled.DISABLED,
+                hnsw_config=self.hnsw_config(),
+            )
+        }
+
+    def search_params(self):
+        if self.quantization is None:
+            return None
+        return models.SearchParams(
+            quantization=models.QuantizationSearchParams(
+                rescore=self.rescore, oversampling=self.oversampling
+            )
+        )
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the rag modules import each other from within src, as streamlit runs them
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
@@ -0,0 +1,65 @@
+import re
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def tokens(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def token_index(token, size):
+    return zlib.crc32(token.encode("utf-8")) % size
+
+
+class FakeTextEmbedding:
+    """
+    Deterministic stand-in for fastembed's TextEmbedding: normalized bag of
+    hashed words, texts sharing words are similar. Nothing is downloaded.
+    """
+
+    def __init__(self, model_name=None, dim=384, **kwargs):
+        self.dim = dim
+
+    def embed_one(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokens(text):
+            vector[token_index(token, self.dim)] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def passage_embed(self, texts, **kwargs):
+        for text in texts:
+            yield self.embed_one(text)
+
+    def query_embed(self, query, **kwargs):
+        queries = [query] if isinstance(query, str) else query
+        for text in queries:
+            yield self.embed_one(text)
+
+
+class FakeSparseTextEmbedding:
+    """Stand-in for fastembed's SparseTextEmbedding: hashed term frequencies"""
+
+    def __init__(self, model_name=None, **kwargs):
+        pass
+
+    def embed_one(self, text):
+        counts = {}
+        for token in tokens(text):
+            index = token_index(token, 2**31)
+            counts[index] = counts.get(index, 0.0) + 1.0
+        return SimpleNamespace(
+            indices=np.array(list(counts), dtype=np.int64),
+            values=np.array(list(counts.values()), dtype=np.float32),
+        )
+
+    def passage_embed(self, texts, **kwargs):
+        for text in texts:
+            yield self.embed_one(text)
+
+    def query_embed(self, query, **kwargs):
+        queries = [query] if isinstance(query, str) else query
+        for text in queries:
+            yield self.embed_one(text)
@@ -0,0 +1,96 @@
+import unittest
+from types import SimpleNamespace
+
+from qdrant.context_packing import ContextPacker, overlap_length
+
+
+class WordCounter:
+    """Counts words instead of model tokens, no tokenizer needed"""
+
+    def count(self, text):
+        return len(text.split())
+
+
+def chunk(text, source="a.md", score=1.0):
+    return SimpleNamespace(score=score, metadata={"source": source, "document": text})
+
+
+class TestContextPacker(unittest.TestCase):
+    def setUp(self):
+        """Set up a packer counting words."""
+        self.packer = ContextPacker(
+            token_budget=40, counter=WordCounter(), min_overlap=8, max_overlap=200
+        )
+
+    def test_overlap_length(self):
+        """Test the longest suffix of the first text that starts the second."""
+        self.assertEqual(overlap_length("abcdef", "defgh", 2, 10), 3)
+        self.assertEqual(overlap_length("abcdef", "xyz", 2, 10), 0)
+        # shorter overlaps than min_overlap are ignored
+        self.assertEqual(overlap_length("abcdef", "fgh", 2, 10), 0)
+
+    def test_remove_overlap(self):
+        """Test text another chunk already contains is removed."""
+        first = "alpha beta gamma delta epsilon"
+        second = "gamma delta epsilon zeta eta"
+
+        self.assertEqual(self.packer.remove_overlap(second, [first]), "zeta eta")
+        self.assertEqual(self.packer.remove_overlap("beta gamma", [first]), "")
+        self.assertEqual(
+            self.packer.remove_overlap("alpha beta gamma delta", [second]),
+            "alpha beta",
+        )
+
+    def test_pack_orders_by_score(self):
+        """Test chunks are packed best first with one reference per source."""
+        retrieval = [
+            chunk("low score text", "a.md", 0.1),
+            chunk("best score text", "a.md", 0.9),
+            chunk("other source text", "b.md", 0.5),
+        ]
+
+        context, stats = self.packer.pack(retrieval)
+
+        self.assertLess(context.index("best"), context.index("other"))
+        self.assertLess(context.index("other"), context.index("low"))
+        self.assertEqual(context.count("## Reference:a.md"), 1)
+        self.assertEqual(context.count("## Reference:b.md"), 1)
+        self.assertEqual(stats["chunks"], 3)
+        self.assertEqual(stats["skipped"], 0)
+        self.assertEqual(stats["tokens"], WordCounter().count(context))
+
+    def test_pack_respects_budget(self):
+        """Test chunks over the budget are skipped, smaller ones still fit."""
+        retrieval = [
+            chunk(" ".join(["big"] * 30), score=0.9),
+            chunk(" ".join(["huge"] * 30), score=0.8),
+            chunk("small chunk", score=0.1),
+        ]
+
+        context, stats = self.packer.pack(retrieval)
+
+        self.assertNotIn("huge", context)
+        self.assertIn("small chunk", context)
+        self.assertEqual(stats["chunks"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertLessEqual(stats["tokens"], self.packer.token_budget)
+
+    def test_pack_removes_overlap(self):
+        """Test the overlap of adjacent chunks is only packed once."""
+        retrieval = [
+            chunk("one two three four five six", score=0.9),
+            chunk("four five six seven eight", score=0.8),
+            chunk("two three four", score=0.7),
+        ]
+
+        context, stats = self.packer.pack(retrieval)
+
+        self.assertEqual(context.count("four five six"), 1)
+        self.assertIn("seven eight", context)
+        # fully contained chunks are skipped
+        self.assertEqual(stats["chunks"], 2)
+        self.assertEqual(stats["skipped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
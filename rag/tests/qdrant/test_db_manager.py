@@ -0,0 +1,237 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from qdrant import db_manager as db_manager_module
+from qdrant import indexing
+from qdrant.db_manager import VectorDbManager
+from qdrant.ingestion import IngestionManifest
+from tests.fakes import FakeSparseTextEmbedding, FakeTextEmbedding
+
+DOCUMENT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "resources", "documents"
+)
+
+QUESTIONS = [
+    "Which data source provides the OHLCV data?",
+    "Which model performed best for forecasting the asset chart?",
+    "What are the steps of inference-time distillation?",
+    "Why was Rust chosen for the Merkle tree API?",
+    "How does the API manage concurrent access to trees?",
+    "What are the benefits of a model router?",
+    "How should the routing quality be evaluated?",
+    "Which design pattern should the Terraform agent use?",
+    "Why does infrastructure as code simplify context window optimization?",
+    "How are hallucinations reduced?",
+]
+
+
+class TestVectorDbManager(unittest.TestCase):
+    def setUp(self):
+        """Index the bundled documents in Qdrant's local mode with fake models."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.patches = [
+            patch.object(db_manager_module, "DOCUMENT_DIR", DOCUMENT_DIR),
+            patch.object(db_manager_module, "MANIFEST_DIR", self.temp_dir),
+            patch.object(db_manager_module, "TextEmbedding", FakeTextEmbedding),
+            patch.object(indexing, "TextEmbedding", FakeTextEmbedding),
+            patch.object(
+                db_manager_module, "SparseTextEmbedding", FakeSparseTextEmbedding
+            ),
+            patch.object(indexing, "SparseTextEmbedding", FakeSparseTextEmbedding),
+            # silence the progress prints
+            patch("builtins.print"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def create_db_manager(self, hybrid):
+        db_manager = VectorDbManager(location=":memory:", hybrid=hybrid)
+        db_manager.init_qdrant("test")
+        return db_manager
+
+    def assert_top_source_matches_majority_vote(self, db_manager):
+        for question in QUESTIONS:
+            with self.subTest(question=question):
+                voted = db_manager.majority_vote(
+                    db_manager.retrieve_information(question, limit=7)
+                )
+                top_source = db_manager.retrieve_top_source(
+                    question, group_size=7, aggregation="count"
+                )
+
+                self.assertEqual(
+                    top_source[0].metadata["source"], voted[0].metadata["source"]
+                )
+                # the grouped result holds the voted chunks, possibly more
+                self.assertLessEqual(
+                    {doc.id for doc in voted}, {doc.id for doc in top_source}
+                )
+
+    def test_top_source_matches_majority_vote(self):
+        """Test the grouping picks the same source and chunks as majority_vote."""
+        self.assert_top_source_matches_majority_vote(self.create_db_manager(False))
+
+    def test_hybrid_top_source(self):
+        """Test the grouped hybrid query returns the best chunks of one source."""
+        db_manager = self.create_db_manager(True)
+
+        for question in QUESTIONS:
+            with self.subTest(question=question):
+                top_source = db_manager.retrieve_top_source(question, group_size=7)
+                hits = db_manager.retrieve_information(question, limit=7)
+
+                # the local mode fuses the scores per group, unlike the
+                # server, so the choice may differ from majority_vote
+                self.assertLessEqual(len(top_source), 7)
+                self.assertEqual(len({doc.metadata["source"] for doc in top_source}), 1)
+                scores = [doc.score for doc in top_source]
+                self.assertEqual(scores, sorted(scores, reverse=True))
+                self.assertIn(
+                    top_source[0].metadata["source"],
+                    {doc.metadata["source"] for doc in hits},
+                )
+
+    def test_unknown_aggregation(self):
+        """Test an unknown aggregation is rejected."""
+        db_manager = self.create_db_manager(False)
+
+        with self.assertRaises(ValueError):
+            db_manager.retrieve_top_source("Rust", aggregation="median")
+
+
+class RecordingTextEmbedding(FakeTextEmbedding):
+    """Fake model remembering every embedded passage"""
+
+    passages = []
+
+    def passage_embed(self, texts, **kwargs):
+        for text in texts:
+            self.passages.append(text)
+            yield self.embed_one(text)
+
+
+class TestDocumentSync(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary document directory and a local collection."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.document_dir = os.path.join(self.temp_dir, "documents")
+        self.manifest_dir = os.path.join(self.temp_dir, "index")
+        os.mkdir(self.document_dir)
+        self.write("a.md", "# A\n## One\nFirst part\n")
+        self.write("b.md", "# B\nOther document\n")
+        RecordingTextEmbedding.passages = []
+
+        self.patches = [
+            patch.object(db_manager_module, "DOCUMENT_DIR", self.document_dir),
+            patch.object(db_manager_module, "MANIFEST_DIR", self.manifest_dir),
+            patch.object(db_manager_module, "TextEmbedding", RecordingTextEmbedding),
+            patch.object(indexing, "TextEmbedding", RecordingTextEmbedding),
+            patch("builtins.print"),
+        ]
+        for p in self.patches:
+            p.start()
+        self.db_manager = VectorDbManager(location=":memory:")
+        self.db_manager.init_qdrant("test")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, text):
+        with open(os.path.join(self.document_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def manifest(self):
+        return IngestionManifest(os.path.join(self.manifest_dir, "test.json"))
+
+    def points(self):
+        points, _ = self.db_manager.client.scroll("test", limit=100, with_payload=True)
+        return {point.id: point.payload["document"] for point in points}
+
+    def test_initial_sync(self):
+        """Test all chunks are indexed and recorded in the manifest."""
+        manifest = self.manifest()
+
+        self.assertEqual(len(RecordingTextEmbedding.passages), 2)
+        self.assertEqual(len(self.points()), 2)
+        self.assertEqual(
+            set(self.points()),
+            {id for file in manifest.files for id in manifest.chunk_ids(file)},
+        )
+
+    def test_unchanged_documents_are_skipped(self):
+        """Test a restart does not embed unchanged documents again."""
+        version = self.manifest().version
+
+        self.db_manager.init_qdrant("test")
+
+        self.assertEqual(len(RecordingTextEmbedding.passages), 2)
+        self.assertEqual(self.manifest().version, version)
+
+    def test_changed_document_only_embeds_new_chunks(self):
+        """Test an edited document replaces its chunks, new text is embedded."""
+        version = self.manifest().version
+        self.write("a.md", "# A\n## One\nFirst part, edited\n")
+
+        self.db_manager.init_qdrant("test")
+
+        self.assertEqual(len(RecordingTextEmbedding.passages), 3)
+        self.assertIn("edited", RecordingTextEmbedding.passages[-1])
+        documents = sorted(self.points().values())
+        self.assertEqual(len(documents), 2)
+        self.assertIn("edited", documents[0])
+        self.assertEqual(self.manifest().version, version + 1)
+        self.assertEqual(self.db_manager.collection_version, version + 1)
+
+    def test_deleted_document_is_removed(self):
+        """Test the chunks of a deleted document are removed."""
+        os.remove(os.path.join(self.document_dir, "b.md"))
+
+        self.db_manager.init_qdrant("test")
+
+        self.assertEqual(len(self.points()), 1)
+        self.assertEqual(
+            list(self.manifest().files), [os.path.join(self.document_dir, "a.md")]
+        )
+
+    def test_renamed_heading_updates_sections(self):
+        """Test chunks below a renamed heading are indexed with the new path."""
+        intro = "Introduction of the document. " * 50
+        details = "Details of the other section. " * 50
+        self.write("a.md", f"# Old Title\n{intro}\n## Other\n{details}\n")
+        self.db_manager.init_qdrant("test")
+        self.write("a.md", f"# New Title\n{intro}\n## Other\n{details}\n")
+
+        self.db_manager.init_qdrant("test")
+
+        points, _ = self.db_manager.client.scroll("test", limit=100, with_payload=True)
+        sections = sorted(point.payload["section"] for point in points)
+        self.assertEqual(sections, ["B", "New Title", "New Title > Other"])
+
+    def test_new_chunker_settings_rechunk(self):
+        """Test changed chunker settings re-chunk, identical chunks are kept."""
+        manifest = self.manifest()
+        manifest.chunker = {"chunker": "recursive"}
+        manifest.save()
+
+        self.db_manager.init_qdrant("test")
+
+        # the chunks did not change, so neither did their point ids
+        self.assertEqual(len(RecordingTextEmbedding.passages), 2)
+        self.assertEqual(len(self.points()), 2)
+        self.assertEqual(self.manifest().chunker["chunker"], "markdown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from qdrant.ingestion import IngestionManifest, chunk_id, hash_file, hash_text
+
+
+class TestIngestionManifest(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary manifest path."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "index", "projects.json")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_and_load(self):
+        """Test a saved manifest is loaded with all its settings."""
+        manifest = IngestionManifest(self.path)
+        self.assertFalse(manifest.exists())
+        manifest.update("docs/a.md", "file-hash", ["h1", "h2"])
+        manifest.version = 3
+        manifest.chunker = {"chunker": "markdown", "chunk_size": 2048}
+        manifest.sparse_model = "Qdrant/bm25"
+        manifest.storage = {"quantization": "scalar"}
+        manifest.save()
+
+        loaded = IngestionManifest(self.path)
+
+        self.assertTrue(loaded.exists())
+        self.assertEqual(loaded.version, 3)
+        self.assertEqual(loaded.chunker, manifest.chunker)
+        self.assertEqual(loaded.sparse_model, "Qdrant/bm25")
+        self.assertEqual(loaded.storage, {"quantization": "scalar"})
+        self.assertEqual(loaded.file_hash("docs/a.md"), "file-hash")
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+
+    def test_chunk_ids(self):
+        """Test chunk ids are derived from the source and the chunk hash."""
+        manifest = IngestionManifest(self.path)
+        manifest.update("docs/a.md", "file-hash", ["h1", "h2"])
+
+        self.assertEqual(
+            manifest.chunk_ids("docs/a.md"),
+            [chunk_id("docs/a.md", "h1"), chunk_id("docs/a.md", "h2")],
+        )
+        self.assertEqual(manifest.chunk_ids("docs/missing.md"), [])
+        self.assertIsNone(manifest.file_hash("docs/missing.md"))
+
+    def test_remove_and_reset(self):
+        """Test removing a file and resetting the manifest."""
+        manifest = IngestionManifest(self.path)
+        manifest.update("docs/a.md", "a", ["h1"])
+        manifest.update("docs/b.md", "b", ["h2"])
+
+        manifest.remove("docs/a.md")
+        self.assertEqual(list(manifest.files), ["docs/b.md"])
+
+        manifest.reset()
+        self.assertEqual(manifest.files, {})
+        self.assertEqual(manifest.version, 1)
+
+    def test_hashes_are_deterministic(self):
+        """Test chunk ids and hashes do not change between runs."""
+        file_path = os.path.join(self.temp_dir, "a.md")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("# A\ncontent")
+
+        self.assertEqual(hash_file(file_path), hash_text("# A\ncontent"))
+        self.assertEqual(chunk_id("a.md", "h"), chunk_id("a.md", "h"))
+        self.assertNotEqual(chunk_id("a.md", "h"), chunk_id("b.md", "h"))
+
+
+if __name__ == "__main__":
+    unittest.main()
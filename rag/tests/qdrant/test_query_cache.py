@@ -0,0 +1,124 @@
+import unittest
+from unittest.mock import patch
+
+from qdrant.query_cache import QueryCache, SemanticCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a controllable clock for the time to live."""
+        self.clock = FakeClock()
+        self.patch = patch("qdrant.query_cache.time.monotonic", self.clock)
+        self.patch.start()
+
+    def tearDown(self):
+        """Restore the clock."""
+        self.patch.stop()
+
+    def test_normalize_query(self):
+        """Test questions differing in case and whitespace share a key."""
+        self.assertEqual(normalize_query("  What IS\n  RAG? "), "what is rag?")
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = QueryCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl(self):
+        """Test entries expire after the time to live."""
+        cache = QueryCache(ttl=10)
+        cache.put("a", 1)
+
+        self.clock.now += 9
+        self.assertEqual(cache.get("a"), 1)
+        self.clock.now += 1
+        self.assertEqual(cache.get("a", "expired"), "expired")
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_stats(self):
+        """Test hits and misses are counted."""
+        cache = QueryCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+
+        self.assertEqual(
+            cache.stats(), {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+        )
+        cache.clear()
+        self.assertEqual(cache.stats()["size"], 0)
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        """Set up a controllable clock for the time to live."""
+        self.clock = FakeClock()
+        self.patch = patch("qdrant.query_cache.time.monotonic", self.clock)
+        self.patch.start()
+
+    def tearDown(self):
+        """Restore the clock."""
+        self.patch.stop()
+
+    def test_threshold(self):
+        """Test only similar enough query vectors reuse an entry."""
+        cache = SemanticCache(threshold=0.95)
+        cache.put([1.0, 0.0], "scope", "answer")
+
+        self.assertEqual(cache.get([2.0, 0.1], "scope"), "answer")
+        self.assertIsNone(cache.get([1.0, 1.0], "scope"))
+
+    def test_scope(self):
+        """Test entries are only returned for the same scope."""
+        cache = SemanticCache()
+        cache.put([1.0, 0.0], frozenset({"chunk-1"}), "answer")
+
+        self.assertIsNone(cache.get([1.0, 0.0], frozenset({"chunk-2"})))
+        self.assertEqual(cache.get([1.0, 0.0], frozenset({"chunk-1"})), "answer")
+
+    def test_best_match_wins(self):
+        """Test the most similar entry above the threshold is returned."""
+        cache = SemanticCache(threshold=0.9)
+        cache.put([1.0, 0.3], "scope", "close")
+        cache.put([1.0, 0.05], "scope", "closest")
+
+        self.assertEqual(cache.get([1.0, 0.0], "scope"), "closest")
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = SemanticCache(max_size=2)
+        cache.put([1.0, 0.0, 0.0], "scope", "a")
+        cache.put([0.0, 1.0, 0.0], "scope", "b")
+        cache.get([1.0, 0.0, 0.0], "scope")
+        cache.put([0.0, 0.0, 1.0], "scope", "c")
+
+        self.assertEqual(cache.get([1.0, 0.0, 0.0], "scope"), "a")
+        self.assertIsNone(cache.get([0.0, 1.0, 0.0], "scope"))
+
+    def test_ttl(self):
+        """Test entries expire after the time to live."""
+        cache = SemanticCache(ttl=10)
+        cache.put([1.0, 0.0], "scope", "answer")
+
+        self.clock.now += 10
+        self.assertIsNone(cache.get([1.0, 0.0], "scope"))
+        self.assertEqual(cache.stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
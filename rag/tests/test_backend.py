@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+from backend import QueueFullError, RequestPool
+
+
+class TestRequestPool(unittest.IsolatedAsyncioTestCase):
+    async def hold(self, pool, release):
+        async with pool.slot():
+            await release.wait()
+
+    async def test_concurrency_limit(self):
+        """Test requests beyond max_concurrency wait for a free slot."""
+        pool = RequestPool(max_concurrency=2, max_queue=4)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(self.hold(pool, release)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        self.assertEqual(pool.stats()["running"], 2)
+        self.assertEqual(pool.stats()["waiting"], 1)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(pool.stats()["completed"], 3)
+        self.assertEqual(pool.stats()["running"], 0)
+
+    async def test_full_queue_rejects(self):
+        """Test requests are rejected once max_queue requests wait."""
+        pool = RequestPool(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(self.hold(pool, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with self.assertRaises(QueueFullError):
+            async with pool.slot():
+                pass
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(pool.stats()["completed"], 2)
+
+    async def test_cancelled_request_frees_its_slot(self):
+        """Test a cancelled request is counted and releases its slot."""
+        pool = RequestPool(max_concurrency=1, max_queue=1)
+        task = asyncio.create_task(self.hold(pool, asyncio.Event()))
+        await asyncio.sleep(0)
+
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(pool.stats()["cancelled"], 1)
+        async with pool.slot():
+            self.assertEqual(pool.stats()["running"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
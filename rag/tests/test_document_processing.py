@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from document_processing import DocumentProcessor, MarkdownChunker, common_path
+
+
+class TestMarkdownChunker(unittest.TestCase):
+    def setUp(self):
+        """Set up a chunker with a small chunk size."""
+        self.chunker = MarkdownChunker(chunk_size=200, chunk_overlap=40)
+
+    def test_split_sections_header_paths(self):
+        """Test every section gets the path of its enclosing headings."""
+        text = (
+            "# Project\nIntro\n## Setup\nInstall\n### Linux\nApt\n"
+            "## Usage\nRun\n# Other\nText\n"
+        )
+
+        sections = self.chunker.split_sections(text)
+
+        self.assertEqual(
+            [path for path, _ in sections],
+            [
+                ["Project"],
+                ["Project", "Setup"],
+                ["Project", "Setup", "Linux"],
+                ["Project", "Usage"],
+                ["Other"],
+            ],
+        )
+        self.assertEqual(sections[2][1], "### Linux\nApt")
+
+    def test_headings_in_code_blocks_are_ignored(self):
+        """Test comment lines in fenced code blocks do not start a section."""
+        text = "# Usage\n```bash\n# install the dependencies\npip install\n```\n"
+
+        sections = self.chunker.split_sections(text)
+
+        self.assertEqual(len(sections), 1)
+        self.assertEqual(sections[0][0], ["Usage"])
+
+    def test_small_sections_are_packed(self):
+        """Test adjacent sections share a chunk while they fit."""
+        text = "# Project\n## A\nFirst section\n## B\nSecond section\n"
+
+        chunks = self.chunker.split_text(text)
+
+        self.assertEqual(len(chunks), 1)
+        self.assertIn("First section", chunks[0][0])
+        self.assertIn("Second section", chunks[0][0])
+        self.assertEqual(chunks[0][1], "Project")
+
+    def test_chunks_end_at_section_boundaries(self):
+        """Test sections that do not fit start a new chunk instead of being cut."""
+        sections = [f"## Part {i}\n" + f"word{i} " * 15 for i in range(4)]
+        text = "# Project\n" + "\n".join(sections)
+
+        chunks = self.chunker.split_text(text)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk, _ in chunks:
+            self.assertLessEqual(len(chunk), self.chunker.chunk_size)
+        for i in range(4):
+            # every section is contained in exactly one chunk as a whole
+            containing = [chunk for chunk, _ in chunks if f"## Part {i}\n" in chunk]
+            self.assertEqual(len(containing), 1)
+            self.assertIn(sections[i].strip(), containing[0])
+
+    def test_bare_heading_moves_to_next_chunk(self):
+        """Test a heading without text is not left at the end of a chunk."""
+        text = "## A\n" + "a " * 80 + "\n# B\n## C\n" + "c " * 40
+
+        chunks = self.chunker.split_text(text)
+
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(chunks[1][0].startswith("# B"))
+        self.assertEqual(chunks[1][1], "B")
+
+    def test_large_section_is_split_with_overlap(self):
+        """Test only sections above the chunk size are split, with overlap."""
+        words = " ".join(f"w{i:03d}" for i in range(120))
+        text = f"# Big\n{words}\n"
+
+        chunks = self.chunker.split_text(text)
+
+        self.assertGreater(len(chunks), 2)
+        for chunk, path in chunks:
+            self.assertLessEqual(len(chunk), self.chunker.chunk_size)
+            self.assertEqual(path, "Big")
+        # the heading is split off at its line break, the words overlap
+        for (first, _), (second, _) in zip(chunks[1:], chunks[2:]):
+            self.assertIn(second.split()[0], first)
+
+    def test_common_path(self):
+        """Test the common prefix of section paths."""
+        self.assertEqual(common_path([["a", "b"], ["a", "c"]]), ["a"])
+        self.assertEqual(common_path([["a", "b"], ["a", "b", "c"]]), ["a", "b"])
+        self.assertEqual(common_path([["a"], ["b"]]), [])
+
+
+class TestDocumentProcessor(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary document directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        for name in ["b.md", "a.md", ".hidden.md"]:
+            with open(os.path.join(self.temp_dir, name), "w", encoding="utf-8") as f:
+                f.write(f"# {name}\nContent of {name}\n")
+        os.mkdir(os.path.join(self.temp_dir, ".git"))
+        with open(os.path.join(self.temp_dir, ".git", "c.md"), "w") as f:
+            f.write("# ignored\n")
+        self.processor = DocumentProcessor(self.temp_dir)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_list_files(self):
+        """Test files are listed sorted, without hidden files and directories."""
+        files = self.processor.list_files()
+
+        self.assertEqual(
+            files, [os.path.join(self.temp_dir, name) for name in ["a.md", "b.md"]]
+        )
+
+    def test_iter_chunks_metadata(self):
+        """Test chunks carry their source file and section path."""
+        chunks = list(self.processor.iter_chunks())
+
+        self.assertEqual(len(chunks), 2)
+        text, metadata = chunks[0]
+        self.assertIn("Content of a.md", text)
+        self.assertEqual(metadata["source"], os.path.join(self.temp_dir, "a.md"))
+        self.assertEqual(metadata["section"], "a.md")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from lightrag_embedding import CachedEmbedding
+
+
+class TestCachedEmbedding(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Set up a temporary cache and a fake embedding function."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "embeddings.sqlite")
+        self.requests = []
+        self.max_texts = None
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+
+    async def embed(self, texts):
+        self.requests.append(list(texts))
+        if self.max_texts is not None and len(texts) > self.max_texts:
+            raise ValueError("batch too large")
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def create_embedding(self, max_batch_tokens=100):
+        return CachedEmbedding(
+            self.embed, "model", self.cache_path, max_batch_tokens=max_batch_tokens
+        )
+
+    def test_batches(self):
+        """Test texts are grouped by their estimated tokens."""
+        embedding = self.create_embedding(max_batch_tokens=10)
+        texts = ["a" * 16, "b" * 16, "c" * 40, "d"]
+
+        batches = list(embedding.batches(texts))
+
+        # 5 + 5 tokens fit, the 11 token text gets a batch of its own
+        self.assertEqual(batches, [texts[:2], [texts[2]], [texts[3]]])
+
+    async def test_cached_and_duplicate_texts(self):
+        """Test duplicates are embedded once and cached texts not again."""
+        embedding = self.create_embedding()
+
+        vectors = await embedding(["one", "two", "one"])
+        self.assertEqual(vectors.shape, (3, 2))
+        np.testing.assert_array_equal(vectors[0], vectors[2])
+        self.assertEqual(self.requests, [["one", "two"]])
+
+        await embedding(["two", "three"])
+        self.assertEqual(self.requests[-1], ["three"])
+        self.assertEqual(embedding.stats()["hits"], 2)
+        self.assertEqual(embedding.stats()["misses"], 3)
+
+    async def test_rejected_batch_is_split(self):
+        """Test a batch the model rejects is split in half until it fits."""
+        embedding = self.create_embedding()
+        self.max_texts = 1
+        texts = ["a", "bb", "ccc", "dddd"]
+
+        vectors = await embedding(texts)
+
+        self.assertEqual(vectors[:, 0].tolist(), [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(embedding.stats()["requests"], 7)
+
+    async def test_single_text_failure_is_raised(self):
+        """Test a text that fails on its own is not retried forever."""
+        embedding = self.create_embedding()
+        self.max_texts = 0
+
+        with self.assertRaises(ValueError):
+            await embedding(["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from lightrag.base import DocStatus
+
+from lightrag_ingestion import IngestionCheckpoint, LightRagIngestion
+
+
+class FakeDocStatus:
+    def __init__(self):
+        self.statuses = {}
+
+    async def get_by_id(self, doc_id):
+        return self.statuses.get(doc_id)
+
+
+class FakeRag:
+    """Records insertions and deletions, every inserted document is processed"""
+
+    def __init__(self):
+        self.llm_model_max_async = 2
+        self.max_parallel_insert = 1
+        self.doc_status = FakeDocStatus()
+        self.calls = []
+
+    async def ainsert(self, contents, ids, file_paths):
+        self.calls.append(("insert", list(ids)))
+        for doc_id in ids:
+            self.doc_status.statuses[doc_id] = {"status": DocStatus.PROCESSED}
+
+    async def adelete_by_doc_id(self, doc_id):
+        self.calls.append(("delete", doc_id))
+        self.doc_status.statuses.pop(doc_id, None)
+
+
+class TestLightRagIngestion(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Set up a document directory and a checkpoint in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.document_dir = os.path.join(self.temp_dir, "docs")
+        os.makedirs(self.document_dir)
+        self.checkpoint_path = os.path.join(self.temp_dir, "checkpoint.json")
+        self.rag = FakeRag()
+        self.write("a.md", "Alpha document")
+        self.write("b.md", "Beta document")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, file_name, content):
+        with open(os.path.join(self.document_dir, file_name), "w") as f:
+            f.write(content)
+
+    async def ingest(self):
+        ingestion = LightRagIngestion(self.rag, self.document_dir, self.checkpoint_path)
+        return await ingestion.run()
+
+    async def test_processed_documents_are_skipped(self):
+        """Test a restart only inserts new documents."""
+        self.assertEqual(await self.ingest(), ["a.md", "b.md"])
+        self.assertEqual(await self.ingest(), [])
+
+        self.write("c.md", "Gamma document")
+        self.assertEqual(await self.ingest(), ["c.md"])
+        self.assertEqual(len(IngestionCheckpoint(self.checkpoint_path).files), 3)
+
+    async def test_edited_document_replaces_previous_version(self):
+        """Test the old version of an edited document is deleted before inserting."""
+        await self.ingest()
+        old_doc_id = IngestionCheckpoint(self.checkpoint_path).doc_id("a.md")
+        self.rag.calls.clear()
+
+        self.write("a.md", "Alpha document, edited")
+        self.assertEqual(await self.ingest(), ["a.md"])
+
+        new_doc_id = IngestionCheckpoint(self.checkpoint_path).doc_id("a.md")
+        self.assertNotEqual(new_doc_id, old_doc_id)
+        self.assertEqual(
+            self.rag.calls, [("delete", old_doc_id), ("insert", [new_doc_id])]
+        )
+
+    async def test_reverted_document_is_not_inserted_again(self):
+        """Test a file reverted to an inserted version only deletes the newer one."""
+        await self.ingest()
+        old_doc_id = IngestionCheckpoint(self.checkpoint_path).doc_id("a.md")
+        # the edited version was inserted outside of the checkpoint
+        checkpoint = IngestionCheckpoint(self.checkpoint_path)
+        checkpoint.update("a.md", "edited", "doc-edited")
+        checkpoint.save()
+        self.rag.calls.clear()
+
+        self.assertEqual(await self.ingest(), [])
+        self.assertEqual(self.rag.calls, [("delete", "doc-edited")])
+        self.assertEqual(
+            IngestionCheckpoint(self.checkpoint_path).doc_id("a.md"), old_doc_id
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from lightrag_llm import AdaptiveConcurrency, CachedCompletion, CompletionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def setUp(self):
+        """Set up a controllable clock for the throughput windows."""
+        self.clock = FakeClock()
+        self.patch = patch("lightrag_llm.time.perf_counter", self.clock)
+        self.patch.start()
+        self.concurrency = AdaptiveConcurrency(initial=2, min_limit=1, max_limit=4)
+
+    def tearDown(self):
+        """Restore the clock."""
+        self.patch.stop()
+
+    def window(self, throughput):
+        """Complete a window of one second with the given throughput."""
+        self.concurrency.window_start = self.clock.now
+        self.concurrency.window_work = throughput
+        self.clock.now += 1.0
+        self.concurrency.adjust()
+        return self.concurrency.limit
+
+    def test_climbs_while_throughput_grows(self):
+        """Test the limit keeps increasing while the throughput grows."""
+        self.assertEqual(self.window(100), 3)
+        self.assertEqual(self.window(150), 4)
+        # bounded by max_limit
+        self.assertEqual(self.window(200), 4)
+
+    def test_turns_around_when_throughput_drops(self):
+        """Test a throughput drop reverses the direction."""
+        self.window(100)
+        self.window(150)
+        self.assertEqual(self.concurrency.limit, 4)
+
+        self.assertEqual(self.window(100), 3)
+        # lower concurrency helps, keep going down
+        self.assertEqual(self.window(150), 2)
+
+    def test_steps_down_on_plateau(self):
+        """Test more concurrency without more throughput is given back."""
+        self.window(100)
+        self.assertEqual(self.concurrency.limit, 3)
+
+        self.assertEqual(self.window(102), 2)
+        self.assertEqual(self.window(101), 1)
+        # bounded by min_limit
+        self.assertEqual(self.window(100), 1)
+
+    def test_window_is_reset(self):
+        """Test every adjustment starts a new window."""
+        self.window(100)
+
+        self.assertEqual(self.concurrency.window_calls, 0)
+        self.assertEqual(self.concurrency.window_work, 0)
+        self.assertEqual(self.concurrency.window_start, self.clock.now)
+
+
+class TestCachedCompletion(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Set up a temporary cache and a fake llm function."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "cache", "llm.sqlite")
+        self.calls = []
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+
+    async def complete(self, prompt, system_prompt=None, **kwargs):
+        self.calls.append(prompt)
+        await asyncio.sleep(0)
+        if kwargs.get("stream"):
+
+            async def stream():
+                yield f"streamed {prompt}"
+
+            return stream()
+        return f"answer to {prompt}"
+
+    async def test_responses_are_cached(self):
+        """Test a repeated prompt is answered from the cache, also after a restart."""
+        completion = CachedCompletion(self.complete, "model", self.cache_path)
+
+        self.assertEqual(await completion("extract"), "answer to extract")
+        self.assertEqual(await completion("extract"), "answer to extract")
+        self.assertEqual(self.calls, ["extract"])
+        self.assertEqual(completion.stats()["hits"], 1)
+        self.assertEqual(completion.stats()["misses"], 1)
+
+        restarted = CachedCompletion(self.complete, "model", self.cache_path)
+        self.assertEqual(await restarted("extract"), "answer to extract")
+        self.assertEqual(self.calls, ["extract"])
+
+    async def test_cache_key(self):
+        """Test the model, system prompt and keyword flag are part of the key."""
+        completion = CachedCompletion(self.complete, "model", self.cache_path)
+        await completion("prompt")
+        await completion("prompt", system_prompt="system")
+        await completion("prompt", keyword_extraction=True)
+        other = CachedCompletion(self.complete, "other-model", self.cache_path)
+        await other("prompt")
+
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(
+            CompletionCache.key("model", "prompt", None, []),
+            CompletionCache.key("model", "prompt", None, []),
+        )
+
+    async def test_generation_options_are_part_of_the_key(self):
+        """Test changed llm options miss the cache, connection arguments do not."""
+        completion = CachedCompletion(self.complete, "model", self.cache_path)
+
+        await completion(
+            "prompt", host="a", hashing_kv=object(), options={"num_ctx": 8192}
+        )
+        await completion(
+            "prompt", host="b", hashing_kv=object(), options={"num_ctx": 8192}
+        )
+        self.assertEqual(len(self.calls), 1)
+
+        await completion("prompt", host="a", options={"num_ctx": 32768})
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_streams_are_passed_through(self):
+        """Test streamed answers are neither cached nor limited."""
+        completion = CachedCompletion(self.complete, "model", self.cache_path)
+
+        for _ in range(2):
+            response = await completion("question", stream=True)
+            self.assertEqual([chunk async for chunk in response], ["streamed question"])
+
+        self.assertEqual(self.calls, ["question", "question"])
+        self.assertEqual(completion.stats()["size"], 0)
+
+    async def test_without_cache(self):
+        """Test cache_path None calls the llm every time."""
+        completion = CachedCompletion(self.complete, "model", None)
+
+        await completion("prompt")
+        await completion("prompt")
+
+        self.assertEqual(self.calls, ["prompt", "prompt"])
+        self.assertEqual(completion.stats()["size"], 0)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    async def test_concurrency_is_limited(self):
+        """Test uncached calls wait for a free slot."""
+        active = []
+        peak = []
+
+        async def slow(prompt, **kwargs):
+            active.append(prompt)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(prompt)
+            return prompt
+
+        completion = CachedCompletion(slow, "model", None)
+        await asyncio.gather(*(completion(f"prompt {i}") for i in range(6)))
+
+        self.assertEqual(max(peak), completion.concurrency.limit)
+
+
+if __name__ == "__main__":
+    unittest.main()